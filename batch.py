@@ -0,0 +1,154 @@
+import numpy
+import citations
+
+
+
+class BatchPrefAging(object):
+    """Runs R independent PrefAging replicates at once. Citation counts and
+    weights are (R x num_records) arrays and each generation is drawn for
+    every replicate in the same few numpy calls. Parents are drawn
+    independently from the weights at the start of the generation (rather
+    than from a pool), with the same caps as Patents.citing."""
+
+    def __init__(self, replicates=100, num_records=200, num_parents=1,
+                 dist='poisson', min_parents=0, gen_len=20, age_exp=1,
+                 cites_exp=1):
+        self.replicates = replicates
+        self.num_records = num_records
+        self.num_parents = num_parents
+        # 'flat', 'ave' or 'poisson'
+        self.dist = dist
+        self.gen_len = gen_len
+        self.age_exp = age_exp
+        self.cites_exp = cites_exp
+
+        # set min and max so that number of parents averages num_parents
+        if dist == 'ave':
+            self.min_parents = min_parents
+            self.max_parents = self.num_parents * 2 - self.min_parents
+        else:
+            self.min_parents = self.num_parents
+            self.max_parents = self.num_parents
+
+        self.define_prior_to_forming()
+
+    def define_prior_to_forming(self):
+        """Initial counts, weights and citations of every replicate"""
+        shape = (self.replicates, self.num_records)
+        self.citation_count = numpy.zeros(shape, dtype=int)
+        self.cites_weights = 1 + numpy.zeros(shape) ** self.cites_exp
+        # (replicate, child, parent) of the citations of each generation
+        self.citations = []
+
+#==============================================================================
+    def form_patents(self):
+        """Forms the patents of every replicate. The first generation has no
+         citations."""
+        self.now_forming = self.gen_len
+        self.gen_num = 1
+        while self.now_forming + 1 < self.num_records:
+            self.generation()
+
+    def generation(self):
+        """Assigns the parents of the current generation in every replicate"""
+        num_children = min(self.gen_len, self.num_records - self.now_forming)
+        shape = (self.replicates, num_children)
+
+        # number of parents for each patent, no more than there are
+        # generations before its own
+        if self.dist == 'poisson':
+            x = numpy.random.poisson(self.num_parents, shape)
+        else:
+            x = numpy.random.randint(self.min_parents, self.max_parents+1, shape)
+        x = numpy.minimum(x, self.gen_num).ravel()
+
+        # rows of cumulative probabilities, offset by their replicate so that
+        # one searchsorted serves all of them
+        cumulative = numpy.cumsum(self.weights(), axis=1)
+        cumulative /= cumulative[:, -1:]
+        cumulative += numpy.arange(self.replicates)[:, None]
+        slots, parents = self.draw_parents(x, cumulative, num_children)
+
+        replicates = slots // num_children
+        children = self.now_forming + slots % num_children
+        self.update_counts(replicates, parents)
+        self.citations.append((replicates, children, parents))
+
+        self.now_forming += num_children
+        self.gen_num += 1
+
+    def draw_parents(self, x, cumulative, num_children):
+        """Draws x[s] distinct parents for every slot s (replicate * num_children
+         + child). Duplicates are dropped and the shortfall drawn again."""
+        num_formed = cumulative.shape[1]
+        slots = numpy.repeat(numpy.arange(len(x)), x)
+        # one key per (slot, parent) so that dropping duplicates is one sort
+        keys = numpy.unique(slots * num_formed + self.draw(cumulative, slots // num_children))
+
+        while True:
+            shortfall = x - numpy.bincount(keys // num_formed, minlength=len(x))
+            if not shortfall.any():
+                return keys // num_formed, keys % num_formed
+            more = numpy.repeat(numpy.arange(len(x)), shortfall)
+            more = more * num_formed + self.draw(cumulative, more // num_children)
+            keys = numpy.unique(numpy.concatenate((keys, more)))
+
+    def draw(self, cumulative, replicates):
+        """Draws one patent for each entry of replicates, from that replicate's
+         row of offset cumulative probabilities"""
+        num_formed = cumulative.shape[1]
+        targets = numpy.random.random(len(replicates)) + replicates
+        patents = numpy.searchsorted(cumulative.ravel(), targets, side='right') - replicates * num_formed
+        return numpy.clip(patents, 0, num_formed - 1)
+
+    def update_counts(self, replicates, parents):
+        """Increments the counts of the cited patents and reweights them"""
+        cited = replicates * self.num_records + parents
+        counts = self.citation_count.reshape(-1)
+        counts += numpy.bincount(cited, minlength=counts.size)
+        self.reweight(cited)
+
+    def reweight(self, cited):
+        """Recomputes the citation term of the cited (flat) entries"""
+        counts = self.citation_count.reshape(-1)[cited].astype(float)
+        self.cites_weights.reshape(-1)[cited] = 1 + counts ** self.cites_exp
+
+    def weights(self):
+        """Weights of the patents formed so far, one row per replicate.
+         probability(k) ~ (1 + k ^ w)(d^-a), see patents.AgingWeights."""
+        num_gens = self.now_forming // self.gen_len
+        ages = self.now_forming - self.gen_len * numpy.arange(num_gens)
+        aging = numpy.repeat(ages.astype(float) ** -self.age_exp, self.gen_len)
+        return self.cites_weights[:, :self.now_forming] * aging[:self.now_forming]
+
+#==============================================================================
+    def citation_graphs(self):
+        """The citations.CitationGraph of every replicate"""
+        if self.citations:
+            replicates, children, parents = [numpy.concatenate(a) for a in zip(*self.citations)]
+        else:
+            replicates = children = parents = numpy.zeros(0, dtype=int)
+
+        keys = replicates.astype(numpy.int64) * self.num_records + children
+        parents = parents[numpy.argsort(keys, kind='mergesort')]
+        num_parents = numpy.bincount(keys, minlength=self.replicates * self.num_records)
+        num_parents = num_parents.reshape(self.replicates, self.num_records)
+        ends = numpy.cumsum(num_parents.sum(axis=1))
+
+        graphs = []
+        for r in range(self.replicates):
+            indptr = numpy.concatenate(([0], numpy.cumsum(num_parents[r])))
+            graphs.append(citations.CitationGraph(indptr, parents[ends[r]-indptr[-1]:ends[r]]))
+        return graphs
+
+
+class BatchUniform(BatchPrefAging):
+    """R independent Uniform replicates: every earlier patent is equally
+    likely to be cited"""
+
+    def reweight(self, cited):
+        """Uniform weights do not depend on citations"""
+
+    def weights(self):
+        """Equal weights for the patents formed so far"""
+        return numpy.ones((self.replicates, self.now_forming))
@@ -0,0 +1,528 @@
+"""Benchmarks for the hot paths of the model.
+
+Run with `python benchmarks.py`. Each benchmark checks the new code against
+the code it replaces and prints one line per problem size."""
+import os
+import sys
+import tempfile
+import time
+import numpy
+import batch
+import bitsets
+import closure
+import detail
+import dot
+import lineage
+import networkanalysis
+import online
+import patents
+import pipeline
+import rwg
+import sketches
+
+
+
+def timed(f, *args):
+    """Calls f and returns its result and the wall time it took"""
+    start_time = time.time()
+    result = f(*args)
+    return result, time.time() - start_time
+
+#==============================================================================
+# weights
+#==============================================================================
+def list_weights(citation_count, aging_coefficients, gen_len, cites_exp, now_forming):
+    """PrefAging.update_weights as a python list over every patent"""
+    weights = [(1 + (citation_count[i] ** cites_exp)) * aging_coefficients[i//gen_len] for i in range(now_forming)]
+    summed_weights = sum(weights)
+    return [weight/float(summed_weights) for weight in weights]
+
+def engine_weights(aging, cited, citation_count, now_forming):
+    """PrefAging.update_weights with AgingWeights"""
+    aging.update_aging(now_forming)
+    aging.update_cites(cited, citation_count)
+    weights = aging.weights(now_forming)
+    return weights / weights.sum()
+
+def bench_weights(sizes=(10**4, 10**5, 10**6), gen_len=100, num_parents=5,
+                  age_exp=1, cites_exp=2):
+    """One generation's reweighting after size patents have formed"""
+    print("weights: records, list (s), engine (s), speedup")
+    for size in sizes:
+        citation_count = numpy.random.poisson(num_parents, size)
+        cited = numpy.random.randint(0, size, gen_len * num_parents)
+
+        aging = patents.AgingWeights(size, gen_len, age_exp, cites_exp)
+        aging.update_aging(size)
+        aging.update_cites(numpy.arange(size), citation_count)
+        aging_coefficients = list(numpy.arange(size, 0, -gen_len, dtype=float) ** -age_exp)
+        counts_list = [int(count) for count in citation_count]
+
+        old, old_time = timed(list_weights, counts_list, aging_coefficients,
+                              gen_len, cites_exp, size)
+        new, new_time = timed(engine_weights, aging, cited, citation_count, size)
+        assert numpy.allclose(old, new, rtol=1e-12, atol=0)
+
+        print("%d, %f, %f, %.1fx" % (size, old_time, new_time, old_time / new_time))
+
+#==============================================================================
+# replicates
+#==============================================================================
+def looped_replicates(replicates, num_records, num_parents, gen_len, age_exp, cites_exp):
+    """One Patents run per replicate, as Testing.lets_cite does"""
+    return [pipeline.cite(num_records, num_parents, 'poisson', gen_len, age_exp,
+                          cites_exp).citation_graph() for r in range(replicates)]
+
+def batched_replicates(replicates, num_records, num_parents, gen_len, age_exp, cites_exp):
+    """Every replicate in one BatchPrefAging run"""
+    runs = batch.BatchPrefAging(replicates, num_records, num_parents, 'poisson',
+                                0, gen_len, age_exp, cites_exp)
+    runs.form_patents()
+    return runs.citation_graphs()
+
+def bench_replicates(replicates=(100, 1000), num_records=200, num_parents=4,
+                     gen_len=20, age_exp=1, cites_exp=1):
+    """Small-network sweeps: replicates of a num_records network"""
+    print("replicates: replicates, looped (s), batched (s), speedup")
+    for r in replicates:
+        args = (r, num_records, num_parents, gen_len, age_exp, cites_exp)
+        old, old_time = timed(looped_replicates, *args)
+        new, new_time = timed(batched_replicates, *args)
+        assert len(old) == len(new) == r
+
+        print("%d, %f, %f, %.1fx" % (r, old_time, new_time, old_time / new_time))
+
+#==============================================================================
+# samplers
+#==============================================================================
+def bench_samplers(sizes=(10**3, 10**4, 10**5, 10**6), draws=(1000, 100000)):
+    """Pools of draws from a probability vector of size outcomes"""
+    print("samplers: outcomes, draws, generate (s), generate_pool (s), "
+          "alias build (s), alias sample (s)")
+    for size in sizes:
+        probs = numpy.random.pareto(1, size) + 1
+        probs /= probs.sum()
+        table, build_time = timed(rwg.AliasTable, probs)
+
+        for n in draws:
+            old, old_time = timed(rwg.generate, n, probs)
+            pool, pool_time = timed(rwg.generate_pool, n, probs)
+            new, new_time = timed(table.sample, n)
+            assert len(old) == len(pool) == len(new) == n
+
+            print("%d, %d, %f, %f, %f, %f" % (size, n, old_time, pool_time,
+                                              build_time, new_time))
+
+def parents_with(sampler, num_records, num_parents, gen_len, cites_exp):
+    """One PrefAging run drawing its parents with sampler"""
+    return pipeline.cite(num_records, num_parents, 'poisson', gen_len, 1,
+                         cites_exp, sampler=sampler).citation_graph()
+
+def bench_parents(cites_exps=(1, 2, 3), num_records=2000, num_parents=3, gen_len=50):
+    """Distinct parents from pools of duplicates against top-k draws, as
+    the weights grow more skewed"""
+    print("parents: cites_exp, pool (s), topk (s), speedup")
+    for cites_exp in cites_exps:
+        args = (num_records, num_parents, gen_len, cites_exp)
+        old, old_time = timed(parents_with, 'pool', *args)
+        new, new_time = timed(parents_with, 'topk', *args)
+        assert all(len(set(parents.tolist())) == len(parents) for parents in new)
+
+        print("%d, %f, %f, %.1fx" % (cites_exp, old_time, new_time, old_time / new_time))
+
+#==============================================================================
+# phenomes
+#==============================================================================
+def loop_chains(na):
+    """first_degree_chains as loops over every child and parent, returning
+     the counts and interactions"""
+    surviving_keywords = na.get_surviving_keywords(na.gen_len)
+    inheritance_count = [0] * len(na.parentage)
+    trait_count = [0] * na.num_keywords
+    interactions = [[] for i in range(len(na.parentage))]
+    for child, parents in enumerate(na.parentage):
+        for parent in parents:
+            intersection = na.phenomes[parent].intersection(na.phenomes[child])
+            intersection = intersection.intersection(surviving_keywords)
+            if intersection:
+                inheritance_count[parent] += len(intersection)
+                for keyword in intersection:
+                    trait_count[keyword] += 1
+                interactions[parent].append(child*len(intersection))
+    return inheritance_count, trait_count, interactions
+
+def bench_phenomes(sizes=(2000, 10**4), num_parents=5, gen_len=100,
+                   num_traits=5, num_keywords=200):
+    """first_degree_chains looping over frozensets, and over every citation
+    at once with frozenset and with bitset phenomes"""
+    print("phenomes: records, loops (s), sets (s), bitsets (s), speedup, sets (MB), bitsets (MB)")
+    for size in sizes:
+        some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+        key_up = pipeline.keyword(size, num_traits, num_keywords)
+        args = (some_patents, key_up, num_traits, num_keywords, gen_len)
+        sets = pipeline.analyze(*args)
+        words = pipeline.analyze(*args, bitsets=True)
+        # the phenomes are built on first use, not timed here
+        sets.phenomes, words.phenomes
+
+        old, old_time = timed(loop_chains, sets)
+        nothing, sets_time = timed(sets.first_degree_chains)
+        nothing, words_time = timed(words.first_degree_chains)
+        for new in (sets, words):
+            assert old == (new.inheritance_count, new.trait_count, new.inheritance_interactions)
+
+        sets_size = sum(sys.getsizeof(phenome) for phenome in sets.phenomes) + sys.getsizeof(sets.phenomes)
+        words_size = words.phenomes.words.nbytes
+        print("%d, %f, %f, %f, %.1fx, %.1f, %.1f" % (size, old_time, sets_time, words_time,
+                                                     old_time / words_time, sets_size / 1e6, words_size / 1e6))
+
+def pairs_average(phenomes):
+    """Mean keyword overlap over every pair of different bitset phenomes"""
+    words = phenomes.words
+    shared = sum(bitsets.popcount(words[i] & words[i+1:]).sum() for i in range(len(words)))
+    return shared / (len(words) * (len(words) - 1) / 2.0)
+
+def bench_random_overlap(sizes=(2000, 10**5), num_parents=3, gen_len=100,
+                         num_traits=5, num_keywords=30, num_pairs=10**5):
+    """Mean keyword overlap of two random records from keyword frequencies,
+    and sampled, against every pair (on the smallest size only)"""
+    print("random overlap: records, pairs (s), exact (s), sampled (s), mean, sampled, interval")
+    for size in sizes:
+        some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+        key_up = pipeline.keyword(size, num_traits, num_keywords)
+        na = pipeline.analyze(some_patents, key_up, num_traits, num_keywords, gen_len, bitsets=True)
+        na.phenomes
+
+        exact, exact_time = timed(na.inheritance_average_random)
+        (sampled, low, high), sampled_time = timed(na.sampled_inheritance_average_random, num_pairs)
+        old_time = float('nan')
+        if size == min(sizes):
+            old, old_time = timed(pairs_average, na.phenomes)
+            assert abs(old - exact) < 1e-9
+
+        print("%d, %f, %f, %f, %.4f, %.4f, %.4f-%.4f" % (size, old_time, exact_time, sampled_time,
+                                                       exact, sampled, low, high))
+
+#==============================================================================
+# phylogenies
+#==============================================================================
+def set_phylogenies(parentage):
+    """NetworkAnalysis.get_phylogenies as unions of frozensets"""
+    parentage_sets = [frozenset(parents.tolist()) for parents in parentage]
+    ancestors = [frozenset() for i in range(len(parentage))]
+    for child, parents in enumerate(parentage_sets):
+        ancestors[child] = parents
+        for parent in parents:
+            ancestors[child] = ancestors[child].union(ancestors[parent])
+
+    descendents = [set() for i in range(len(parentage))]
+    for child in range(len(parentage) - 1, -1, -1):
+        for parent in parentage_sets[child]:
+            descendents[parent].add(child)
+            descendents[parent].update(descendents[child])
+    return ancestors, descendents
+
+def closure_phylogenies(parentage):
+    """NetworkAnalysis.get_phylogenies with closure.Closure"""
+    children = parentage.children()
+    return closure.Closure(parentage, children), closure.Closure(children, parentage)
+
+def bench_phylogenies(sizes=(5000, 20000), num_parents=3, gen_len=100):
+    """Ancestors and descendants of every patent"""
+    print("phylogenies: records, sets (s), closure (s), speedup, sets (MB), closure (MB)")
+    for size in sizes:
+        parentage = pipeline.cite(size, num_parents, 'poisson', gen_len).citation_graph()
+
+        old, old_time = timed(set_phylogenies, parentage)
+        new, new_time = timed(closure_phylogenies, parentage)
+        for i in range(0, size, 97):
+            assert set(new[0][i].tolist()) == old[0][i]
+            assert set(new[1][i].tolist()) == old[1][i]
+
+        old_size = sum(sys.getsizeof(members) for sets in old for members in sets)
+        new_size = new[0].nbytes + new[1].nbytes
+        print("%d, %f, %f, %.1fx, %.1f, %.1f" % (size, old_time, new_time, old_time / new_time,
+                                                 old_size / 1e6, new_size / 1e6))
+
+def closure_counts(parentage, ids):
+    """Descendant counts of ids from the full closure"""
+    return closure.Closure(parentage.children(), parentage).counts(ids)
+
+def searched_counts(parentage, ids):
+    """Descendant counts of ids, searching only from ids"""
+    return lineage.Relatives(parentage.children()).counts(ids)
+
+def bench_descendants(sizes=(5000, 20000), num_parents=3, gen_len=100, num_ids=20):
+    """Descendant counts of the first num_ids patents, as the drivers take"""
+    print("descendants: records, closure (s), search (s), speedup")
+    for size in sizes:
+        parentage = pipeline.cite(size, num_parents, 'poisson', gen_len).citation_graph()
+        ids = range(num_ids)
+
+        old, old_time = timed(closure_counts, parentage, ids)
+        new, new_time = timed(searched_counts, parentage, ids)
+        assert (old == new).all()
+
+        print("%d, %f, %f, %.1fx" % (size, old_time, new_time, old_time / new_time))
+
+def searched_pairs(parentage, pairs):
+    """Whether u is an ancestor of v, searching from u every time"""
+    relatives = lineage.Relatives(parentage.children(), cache_size=0)
+    return numpy.array([v in relatives[u] for u, v in pairs])
+
+def indexed_pairs(parentage, pairs):
+    """Whether u is an ancestor of v, from the reachability index"""
+    index = parentage.reachability()
+    return numpy.array([index.reaches(u, v) for u, v in pairs])
+
+def bench_reachability(sizes=(10**4, 10**5), num_parents=3, gen_len=100, num_pairs=2000):
+    """Ancestry checks of random pairs, as the DOT writers make, including
+    building the index"""
+    print("reachability: records, search (s), index (s), speedup")
+    for size in sizes:
+        parentage = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree').citation_graph()
+        pairs = numpy.random.randint(0, len(parentage), (num_pairs, 2)).tolist()
+
+        old, old_time = timed(searched_pairs, parentage, pairs)
+        new, new_time = timed(indexed_pairs, parentage, pairs)
+        assert (old == new).all()
+
+        print("%d, %f, %f, %.1fx" % (size, old_time, new_time, old_time / new_time))
+
+def sketched_counts(parentage, precision):
+    """Descendant counts of every patent from HyperLogLog sketches"""
+    return sketches.ReachSketches(parentage.children(), parentage, precision).counts()
+
+def bench_sketches(size=5000, num_parents=3, gen_len=50, precisions=(6, 8, 10, 12)):
+    """Sketched descendant counts against the exact closure's, over patents
+    with more than 100 descendants"""
+    print("sketches: records, precision, exact (s), sketched (s), mean error, p95 error, expected")
+    parentage = pipeline.cite(size, num_parents, 'poisson', gen_len).citation_graph()
+    exact, exact_time = timed(closure_counts, parentage, None)
+    large = exact > 100
+    for precision in precisions:
+        estimates, sketch_time = timed(sketched_counts, parentage, precision)
+        errors = sketches.relative_errors(estimates, exact)[large]
+        expected = 1.04 / numpy.sqrt(2 ** precision)
+        assert errors.mean() < 2 * expected
+
+        print("%d, %d, %f, %f, %.4f, %.4f, %.4f" % (size, precision, exact_time, sketch_time,
+                                                  errors.mean(), numpy.percentile(errors, 95), expected))
+
+
+def looped_genealogy(na, roots):
+    """Citations of the genealogy of roots, checking every citation of the
+     graph"""
+    descendents = na.descended_from(roots).tolist()
+    return [(child, parent) for child, parents in enumerate(na.parentage.tolists())
+            for parent in parents if descendents[parent] or parent in roots]
+
+def indexed_genealogy(na, roots):
+    """Citations of the genealogy of roots, from the reverse index"""
+    children, parents = na.genealogy(roots)[1].edges()
+    return list(zip(children.tolist(), parents.tolist()))
+
+def bench_genealogy(sizes=(10**4, 10**5), num_parents=3, gen_len=100, num_roots=10):
+    """Citations among the most prolific first-generation patents and their
+    descendants, as genealogy_dot draws them"""
+    print("genealogy: records, citations, loop (s), indexed (s), speedup")
+    for size in sizes:
+        some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+        key_up = pipeline.keyword(size)
+        na = pipeline.analyze(some_patents, key_up, gen_len=gen_len)
+        counts = na.descendant_counts(range(gen_len))
+        roots = numpy.argsort(counts)[-num_roots:].tolist()
+
+        old, old_time = timed(looped_genealogy, na, roots)
+        new, new_time = timed(indexed_genealogy, na, roots)
+        assert old == new
+
+        print("%d, %d, %f, %f, %.1fx" % (size, len(new), old_time, new_time, old_time / new_time))
+
+#==============================================================================
+# online analysis
+#==============================================================================
+def offline_counts(size, num_parents, gen_len, num_traits, num_keywords):
+    """Descendant counts of the first generation from a finished run"""
+    key_up = pipeline.keyword(size, num_traits, num_keywords)
+    some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+    na = pipeline.analyze(some_patents, key_up, num_traits, num_keywords, gen_len)
+    na.first_degree_chains()
+    return na.descendant_counts(range(gen_len)).tolist()
+
+def online_counts(size, num_parents, gen_len, num_traits, num_keywords, stop=None):
+    """Descendant counts of the first generation, kept up as the run forms"""
+    analysis = pipeline.follow(size, num_parents, 'poisson', gen_len, num_traits,
+                               num_keywords, sampler='tree', stop=stop)
+    return analysis.descendant_counts().tolist(), analysis.formed
+
+def bench_online(sizes=(10**4, 10**5), num_parents=3, gen_len=100, num_traits=5,
+                 num_keywords=100):
+    """A run analyzed once finished, as it forms, and as it forms until the
+    Gini coefficient of the citation counts settles"""
+    print("online: records, offline (s), online (s), stopped (s), stopped at")
+    for size in sizes:
+        args = (size, num_parents, gen_len, num_traits, num_keywords)
+        numpy.random.seed(0)
+        old, old_time = timed(offline_counts, *args)
+        numpy.random.seed(0)
+        (new, formed), new_time = timed(online_counts, *args)
+        assert old == new and formed == size
+
+        stop = online.stable('gini', 0.01, 20)
+        (counts, formed), stopped_time = timed(online_counts, *(args + (stop,)))
+        print("%d, %f, %f, %f, %d" % (size, old_time, new_time, stopped_time, formed))
+
+#==============================================================================
+# dot files
+#==============================================================================
+def sorted_dot(path, children, parents, both):
+    """Citations written as all_dot wrote them: every edge formatted, the
+     strings sorted, then written one at a time"""
+    edges = [networkanalysis.INHERITANCE_EDGES[shared] % (parent, child)
+             for child, parent, shared in zip(children.tolist(), parents.tolist(), both.tolist())]
+    edges.sort()
+    with open(path, 'w') as file:
+        file.write('digraph inheritance {\n')
+        for row in edges:
+            file.write(row)
+        file.write('}\n')
+
+def streamed_dot(path, children, parents, both, compress=False):
+    """Citations written through a dot.DotWriter, ordered on the arrays"""
+    with dot.DotWriter(path, compress=compress) as writer:
+        writer.edges(parents, children, networkanalysis.INHERITANCE_EDGES, both)
+
+def bench_dot(sizes=(10**5, 10**6), num_parents=3, gen_len=100):
+    """Every citation of a network written as a dot file, half of them on
+    top, sorting strings and through the streaming writer, plain and
+    gzipped"""
+    print("dot: records, citations, MB, sorted (s), streamed (s), gzipped (s), speedup, MB/s")
+    directory = tempfile.mkdtemp()
+    old_path, new_path = os.path.join(directory, 'old.dot'), os.path.join(directory, 'new.dot')
+    for size in sizes:
+        some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+        children, parents = some_patents.citation_graph().edges()
+        both = numpy.random.random(len(children)) < 0.5
+
+        old, old_time = timed(sorted_dot, old_path, children, parents, both)
+        new, new_time = timed(streamed_dot, new_path, children, parents, both)
+        with open(old_path) as old_file, open(new_path) as new_file:
+            assert sorted(old_file) == sorted(new_file)
+        zipped, zipped_time = timed(streamed_dot, new_path + '.gz', children, parents, both, True)
+
+        megabytes = os.path.getsize(new_path) / 1e6
+        print("%d, %d, %.1f, %f, %f, %f, %.1fx, %.1f" % (size, len(children), megabytes, old_time,
+              new_time, zipped_time, old_time / new_time, megabytes / new_time))
+        for path in (old_path, new_path, new_path + '.gz'):
+            os.remove(path)
+    os.rmdir(directory)
+
+def looped_grid(path, num_records, gen_len, xmax, ymax, num_rows):
+    """Grid positions as NetworkAnalysis.grid wrote them, one patent at a
+     time"""
+    with open(path, 'w') as file:
+        file.write('digraph inheritance {\n')
+        y = ymax
+        yincr = ymax / (num_rows - 1)
+        x = 0
+        for n in range(num_records):
+            xincr = xmax / (gen_len - 1)
+            file.write('%d [pos="%f, %f!"];\n' % (n, x, y))
+            x += xincr
+            if (n + 1) % gen_len == 0:
+                x = 0
+                y -= yincr
+        file.write('}\n')
+
+def vector_grid(path, num_records, gen_len, xmax, ymax, num_rows):
+    """Grid positions from detail.grid_positions, through a dot.DotWriter"""
+    ids = numpy.arange(num_records)
+    x, y = detail.grid_positions(ids, 0, gen_len, xmax, ymax, ymax, num_rows)
+    with dot.DotWriter(path) as writer:
+        writer.positions(ids, x, y)
+
+def read_positions(path):
+    """Patent, x and y of every position in a dot file"""
+    with open(path) as file:
+        rows = [line.replace('[pos="', ' ').replace(',', ' ').replace('!"];', ' ').split()
+                for line in file if 'pos=' in line]
+    return numpy.array(rows, dtype=float)
+
+def bench_grid(sizes=(10**4, 10**5, 10**6), gen_len=100, xmax=30., ymax=30.):
+    """Grid positions of every patent of a network, as dot_for_graphviz
+    writes them"""
+    print("grid: records, loop (s), vectorized (s), speedup")
+    directory = tempfile.mkdtemp()
+    old_path, new_path = os.path.join(directory, 'old.dot'), os.path.join(directory, 'new.dot')
+    for size in sizes:
+        num_rows = max(100, size // gen_len)
+        old, old_time = timed(looped_grid, old_path, size, gen_len, xmax, ymax, num_rows)
+        new, new_time = timed(vector_grid, new_path, size, gen_len, xmax, ymax, num_rows)
+        # the loop's running sums differ from the products by rounding only
+        assert numpy.allclose(read_positions(old_path), read_positions(new_path), rtol=0, atol=2e-6)
+
+        print("%d, %f, %f, %.1fx" % (size, old_time, new_time, old_time / new_time))
+        for path in (old_path, new_path):
+            os.remove(path)
+    os.rmdir(directory)
+
+#==============================================================================
+# keyword index
+#==============================================================================
+def scanned_carriers(na, keywords):
+    """Carriers of each keyword and the citations between them, scanning
+     every phenome and every citation per keyword"""
+    children, parents = na.parentage.edges()
+    found = []
+    for keyword in keywords:
+        carriers = numpy.array([keyword in phenome for phenome in na.phenomes], dtype=bool)
+        both = carriers[children] & carriers[parents]
+        found.append((numpy.flatnonzero(carriers).tolist(), int(both.sum())))
+    return found
+
+def indexed_carriers(na, keywords):
+    """Carriers of each keyword and the citations between them, from the
+     inverted index"""
+    found = []
+    for keyword in keywords:
+        children, parents = na.carrier_citations([keyword])
+        found.append((na.keyword_rows.carrying([keyword]).tolist(), len(children)))
+    return found
+
+def bench_keyword_index(sizes=(10**4, 10**5), num_parents=3, gen_len=100, num_traits=5,
+                        num_keywords=200):
+    """The patents with each keyword and the citations among them, for
+    every keyword, as the per-keyword dot files and statistics need them"""
+    print("keyword index: records, keywords, scan (s), indexed (s), speedup")
+    for size in sizes:
+        some_patents = pipeline.cite(size, num_parents, 'poisson', gen_len, sampler='tree')
+        key_up = pipeline.keyword(size, num_traits, num_keywords)
+        na = pipeline.analyze(some_patents, key_up, num_traits, num_keywords, gen_len)
+        # the phenomes and the index are built on first use, not timed here
+        na.phenomes, na.keyword_rows.records
+        keywords = range(num_keywords)
+
+        old, old_time = timed(scanned_carriers, na, keywords)
+        new, new_time = timed(indexed_carriers, na, keywords)
+        assert old == new
+
+        print("%d, %d, %f, %f, %.1fx" % (size, num_keywords, old_time, new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    bench_weights()
+    bench_replicates()
+    bench_samplers()
+    bench_parents()
+    bench_phenomes()
+    bench_random_overlap()
+    bench_phylogenies()
+    bench_descendants()
+    bench_reachability()
+    bench_genealogy()
+    bench_sketches()
+    bench_online()
+    bench_dot()
+    bench_grid()
+    bench_keyword_index()
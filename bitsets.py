@@ -0,0 +1,118 @@
+import numbers
+import numpy
+
+
+
+# set bits in every byte value
+POPCOUNT = numpy.array([bin(i).count('1') for i in range(256)], dtype=numpy.uint8)
+WORD = numpy.dtype('<u8')
+
+
+def popcount(words):
+    """Number of set bits in every row of words (or in words, if 1-D)"""
+    words = numpy.ascontiguousarray(words, dtype=WORD)
+    counts = POPCOUNT[words.view(numpy.uint8)]
+    return counts.reshape(words.shape[:-1] + (8 * words.shape[-1],)).sum(axis=-1, dtype=numpy.int64)
+
+def set_bits(words, chunk_bits=2**24):
+    """Row and bit of every set bit in the rows of words, by row and then
+     bit. Rows are unpacked about chunk_bits bits at a time."""
+    words = numpy.ascontiguousarray(words, dtype=WORD)
+    chunk_rows = max(1, chunk_bits // (64 * max(1, words.shape[1])))
+    rows, bits = [], []
+    for start in range(0, len(words), chunk_rows):
+        chunk = words[start:start + chunk_rows]
+        # unpackbits is most significant bit first within each byte
+        unpacked = numpy.unpackbits(chunk.view(numpy.uint8), axis=1)
+        unpacked = unpacked.reshape(len(chunk), -1, 8)[:, :, ::-1].reshape(len(chunk), -1)
+        r, b = numpy.nonzero(unpacked)
+        rows.append(r + start)
+        bits.append(b)
+    if not rows:
+        return numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int)
+    return numpy.concatenate(rows), numpy.concatenate(bits)
+
+
+class Bitsets(object):
+    """Sets of small ints (the keywords of every record) packed into an
+    (n x ceil(num_bits/64)) array of uint64 words: bit k of row i is set if
+    k is in set i. Indexing gives a frozenset, so Bitsets can stand in for
+    a list of frozensets, while whole-array operations run on the words."""
+
+    def __init__(self, words, num_bits):
+        self.words = numpy.asarray(words, dtype=WORD)
+        self.num_bits = num_bits
+
+    @staticmethod
+    def num_words(num_bits):
+        return max(1, (num_bits + 63) // 64)
+
+    @classmethod
+    def from_rows(cls, rows, bits, num_rows, num_bits=0):
+        """Packs the bit of every entry into its row. There are at least
+         num_bits bits per row."""
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        bits = numpy.asarray(bits, dtype=numpy.int64)
+        if len(bits):
+            num_bits = max(num_bits, int(bits.max()) + 1)
+        words = numpy.zeros((num_rows, cls.num_words(num_bits)), dtype=WORD)
+        values = numpy.left_shift(numpy.ones(len(bits), dtype=WORD), (bits % 64).astype(WORD))
+        numpy.bitwise_or.at(words, (rows, bits // 64), values)
+        return cls(words, num_bits)
+
+    @classmethod
+    def from_csr(cls, sets, num_bits=0):
+        """Packs a csr.CSR whose rows are the sets"""
+        return cls.from_rows(sets.rows(), sets.indices, len(sets), num_bits)
+
+    @classmethod
+    def from_sets(cls, sets, num_bits=0):
+        """Packs a list of iterables of ints"""
+        sets = [list(s) for s in sets]
+        lengths = [len(s) for s in sets]
+        rows = numpy.repeat(numpy.arange(len(sets)), lengths)
+        bits = numpy.array([bit for s in sets for bit in s], dtype=numpy.int64)
+        return cls.from_rows(rows, bits, len(sets), num_bits)
+
+    def mask(self, bits):
+        """One row with the given bits set. Bits no set can hold are left
+         out."""
+        bits = [bit for bit in bits
+                if isinstance(bit, numbers.Integral) and 0 <= bit < self.num_bits]
+        return Bitsets.from_rows(numpy.zeros(len(bits)), bits, 1, self.num_bits).words[0]
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, i):
+        return frozenset(self.bits(self.words[i]).tolist())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def bits(self, row):
+        """The set bits of one row of words"""
+        return set_bits(row[None, :])[1]
+
+    def counts(self):
+        """Size of every set"""
+        return popcount(self.words)
+
+    def union(self, rows=None):
+        """One row with the bits of every row in rows (default: all)"""
+        words = self.words if rows is None else self.words[rows]
+        if not len(words):
+            return numpy.zeros(self.words.shape[1], dtype=WORD)
+        return numpy.bitwise_or.reduce(words, axis=0)
+
+    def intersects(self, mask):
+        """Whether each set shares any bit with mask"""
+        return (self.words & mask).any(axis=1)
+
+    def intersections(self, a, b, mask=None):
+        """Words shared by rows a[e] and b[e] for every e, within mask"""
+        shared = self.words[a] & self.words[b]
+        if mask is not None:
+            shared &= mask
+        return shared
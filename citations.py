@@ -0,0 +1,161 @@
+import csv
+import numpy
+import csr
+import reachability
+
+
+
+EVENT = numpy.dtype([('child', '<i4'), ('parent', '<i4'), ('generation', '<i4')])
+
+
+class CitationLog(object):
+    """Append-only log of (child, parent, generation) citation events, kept in
+    memory or written to a binary file as packed int32 triples"""
+
+    def __init__(self, f=None):
+        self.file = f
+        self.chunks = []
+
+    @classmethod
+    def load(cls, path):
+        """Reads a log written to path"""
+        log = cls()
+        log.chunks.append(numpy.fromfile(path, dtype=EVENT))
+        return log
+
+    def append(self, children, parents, generation):
+        """Logs the citations of the children formed in generation"""
+        events = numpy.empty(len(children), dtype=EVENT)
+        events['child'] = children
+        events['parent'] = parents
+        events['generation'] = generation
+
+        if self.file:
+            events.tofile(self.file)
+        else:
+            self.chunks.append(events)
+
+    def events(self):
+        """Every event logged so far, in the order they were logged"""
+        if self.file:
+            if not self.file.closed:
+                self.file.flush()
+            return numpy.fromfile(self.file.name, dtype=EVENT)
+        if not self.chunks:
+            return numpy.empty(0, dtype=EVENT)
+        return numpy.concatenate(self.chunks)
+
+
+class CitationHistory(object):
+    """Citation counts of any patent at any generation, rebuilt from a log.
+    The generations in which each patent was cited are kept as one sorted
+    array per patent (indexed by indptr)."""
+
+    def __init__(self, events, num_records):
+        self.num_records = num_records
+        order = numpy.lexsort((events['generation'], events['parent']))
+        self.times = events['generation'][order]
+        cites = numpy.bincount(events['parent'], minlength=num_records)
+        self.indptr = numpy.concatenate(([0], numpy.cumsum(cites)))
+
+        # (patent, generation) keys for vectorized queries
+        self.num_gens = int(self.times.max()) + 1 if len(self.times) else 1
+        self.keys = events['parent'][order].astype(numpy.int64) * self.num_gens + self.times
+
+    def citation_times(self, patent):
+        """Sorted generations in which patent was cited"""
+        return self.times[self.indptr[patent]:self.indptr[patent+1]]
+
+    def count(self, patent, generation):
+        """Times patent had been cited by the end of generation"""
+        return int(numpy.searchsorted(self.citation_times(patent), generation, side='right'))
+
+    def counts(self, generation, patents=None):
+        """Citation counts of patents (default: all) at the end of generation"""
+        if patents is None:
+            patents = numpy.arange(self.num_records)
+        patents = numpy.asarray(patents, dtype=numpy.int64)
+        generation = min(generation, self.num_gens - 1)
+        ends = numpy.searchsorted(self.keys, patents * self.num_gens + generation, side='right')
+        return ends - self.indptr[patents]
+
+    def final_counts(self):
+        """Citation counts at the end of the run"""
+        return numpy.diff(self.indptr)
+
+
+class CitationGraph(csr.CSR):
+    """Parentage of every patent as CSR arrays: the parents of patent i are
+    parents[indptr[i]:indptr[i+1]]. Iterating gives each patent's parents,
+    like the list of lists it replaces."""
+
+    @classmethod
+    def load(cls, path):
+        """Reads a parentage csv, one row of parents per patent"""
+        with open(path) as f:
+            return cls.from_lists([[int(parent) for parent in row] for row in csv.reader(f)])
+
+    @classmethod
+    def from_events(cls, events, num_records):
+        """Builds the graph from citation events (see CitationLog)"""
+        return cls.from_rows(events['child'], events['parent'], num_records)
+
+    @property
+    def parents(self):
+        return self.indices
+
+    @property
+    def num_records(self):
+        return len(self)
+
+    def edges(self):
+        """Child and parent of every citation"""
+        return self.rows(), self.parents
+
+    def induced(self, nodes):
+        """The citations among nodes, a boolean mask of patents, as a
+         CitationGraph of every patent (the rest cite nothing)"""
+        children, parents = self.edges()
+        keep = nodes[children] & nodes[parents]
+        return CitationGraph.from_rows(children[keep], parents[keep], len(self))
+
+    def children(self):
+        """Reverse index: the children of patent i are children()[i]. Built on
+         first use."""
+        if not hasattr(self, '_children'):
+            self._children = self.transpose(len(self))
+        return self._children
+
+    def reachability(self):
+        """reachability.ReachabilityIndex from every patent to its
+         descendants. Built on first use."""
+        if not hasattr(self, '_reachability'):
+            self._reachability = reachability.ReachabilityIndex(self.children(), self)
+        return self._reachability
+
+
+class CitationGraphBuilder(object):
+    """Grows the CSR arrays of a CitationGraph one generation at a time"""
+
+    def __init__(self, num_records, num_edges=0):
+        self.indptr = numpy.zeros(num_records + 1, dtype=numpy.int64)
+        self.parents = numpy.empty(num_edges, dtype=numpy.int32)
+        self.num_children = 0
+
+    def append(self, num_parents, parents):
+        """Adds the next children, num_parents[i] of parents for the i-th"""
+        first = self.num_children
+        self.num_children += len(num_parents)
+        self.indptr[first+1:self.num_children+1] = self.indptr[first] + numpy.cumsum(num_parents)
+
+        end = self.indptr[self.num_children]
+        if end > len(self.parents):
+            grown = numpy.empty(max(end, 2 * len(self.parents)), dtype=numpy.int32)
+            grown[:len(self.parents)] = self.parents
+            self.parents = grown
+        self.parents[self.indptr[first]:end] = parents
+
+    def graph(self):
+        """The graph of the children added so far"""
+        end = self.indptr[self.num_children]
+        return CitationGraph(self.indptr[:self.num_children+1], self.parents[:end])
@@ -0,0 +1,123 @@
+import numpy
+import bitsets
+
+
+
+class ClosureBlock(object):
+    """The members of every closure that fall in one block of columns,
+    compressed row by row: rows with few members keep them as uint16
+    offsets from the block's start, the rest as bitset words"""
+
+    def __init__(self, start, words):
+        self.start = start
+        counts = bitsets.popcount(words)
+        # offsets take 2 bytes a member, words 8 bytes each
+        dense = counts >= 4 * words.shape[1]
+
+        self.dense_rows = numpy.full(len(words), -1, dtype=numpy.int32)
+        self.dense_rows[dense] = numpy.arange(numpy.count_nonzero(dense))
+        self.dense_words = words[dense]
+
+        sparse = numpy.flatnonzero(~dense)
+        rows, offsets = bitsets.set_bits(words[sparse])
+        lengths = numpy.zeros(len(words), dtype=numpy.int64)
+        lengths[sparse] = numpy.bincount(rows, minlength=len(sparse))
+        self.indptr = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        self.offsets = offsets.astype(numpy.uint16)
+
+    @property
+    def nbytes(self):
+        return (self.dense_rows.nbytes + self.dense_words.nbytes +
+                self.indptr.nbytes + self.offsets.nbytes)
+
+    def members(self, row):
+        """Members of row's closure in this block"""
+        position = self.dense_rows[row]
+        if position >= 0:
+            offsets = bitsets.set_bits(self.dense_words[position:position+1])[1]
+        else:
+            offsets = self.offsets[self.indptr[row]:self.indptr[row+1]]
+        return self.start + offsets.astype(numpy.int64)
+
+    def counts(self):
+        """Number of members of every row's closure in this block"""
+        counts = numpy.diff(self.indptr)
+        dense = self.dense_rows >= 0
+        counts[dense] = bitsets.popcount(self.dense_words)[self.dense_rows[dense]]
+        return counts
+
+
+class Closure(object):
+    """Transitive closure of a graph of CSR rows whose entries are rows (such
+    as a CitationGraph, whose rows point to their parents): closure[i] is the
+    sorted array of every row reachable from row i, so the ancestors of a
+    patent in its graph, or its descendants in graph.children().
+
+    The closure is built one block of columns at a time, level by level
+    (see csr.CSR.levels) with vectorized ORs of bitset rows, and each block
+    is kept compressed (see ClosureBlock). The block being built takes no
+    more than a quarter of budget bytes and MemoryError is raised once what
+    is kept exceeds budget."""
+
+    def __init__(self, rows, transposed=None, budget=2**30):
+        self.num_rows = len(rows)
+        self.budget = budget
+        # words per row of a block, no more than uint16 offsets can address
+        # or the rows need
+        self.block_words = int(min(1024, (self.num_rows + 63) // 64,
+                                   budget // (4 * 8 * max(1, self.num_rows))))
+        self.block_words = max(1, self.block_words)
+        levels = rows.levels(transposed)
+
+        self.blocks = []
+        for start in range(0, self.num_rows, 64 * self.block_words):
+            self.blocks.append(ClosureBlock(start, self.block(rows, levels, start)))
+            if self.nbytes > budget:
+                raise MemoryError("closure of %d rows exceeds its budget of %d bytes"
+                                  % (self.num_rows, budget))
+
+    def block(self, rows, levels, start):
+        """Bitset rows of the members of every closure in the columns from
+         start, built from each level's entries and their closures"""
+        width = 64 * self.block_words
+        words = numpy.zeros((self.num_rows, self.block_words), dtype=bitsets.WORD)
+        for level in levels[1:]:
+            entries = rows.take(level)
+            shared = words[entries.indices]
+            # the entries themselves
+            local = entries.indices.astype(numpy.int64) - start
+            inside = numpy.flatnonzero((local >= 0) & (local < width))
+            shared[inside, local[inside] // 64] |= numpy.left_shift(
+                numpy.ones(len(inside), dtype=bitsets.WORD), (local[inside] % 64).astype(bitsets.WORD))
+            words[level] = numpy.bitwise_or.reduceat(shared, entries.indptr[:-1], axis=0)
+        return words
+
+    @property
+    def nbytes(self):
+        return sum(block.nbytes for block in self.blocks)
+
+    def __len__(self):
+        return self.num_rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return numpy.concatenate([block.members(i) for block in self.blocks])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def of(self, ids):
+        """The closures of each of ids"""
+        return [self[i] for i in ids]
+
+    def counts(self, ids=None):
+        """Size of the closure of each of ids (default: every row)"""
+        counts = sum(block.counts() for block in self.blocks)
+        return counts if ids is None else counts[numpy.asarray(list(ids), dtype=int)]
+
+    def contains(self, i, j):
+        """Whether j is in closure[i]"""
+        block = self.blocks[j // (64 * self.block_words)]
+        return j in block.members(i)
@@ -0,0 +1,89 @@
+import itertools
+import numpy
+
+
+
+class CSR(object):
+    """Rows of ints kept as one indices array split by an indptr array, so that
+    row i is indices[indptr[i]:indptr[i+1]]. Rows come back as numpy views,
+    which lets a CSR stand in for a list of lists without a Python object per
+    entry."""
+
+    def __init__(self, indptr, indices):
+        self.indptr = numpy.asarray(indptr, dtype=numpy.int64)
+        self.indices = numpy.asarray(indices, dtype=numpy.int32)
+
+    @classmethod
+    def from_lists(cls, rows):
+        """Builds the arrays from a list of lists"""
+        lengths = numpy.fromiter((len(row) for row in rows), dtype=numpy.int64, count=len(rows))
+        indptr = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        indices = numpy.fromiter(itertools.chain.from_iterable(rows), dtype=numpy.int32, count=indptr[-1])
+        return cls(indptr, indices)
+
+    @classmethod
+    def from_rows(cls, rows, indices, num_rows):
+        """Builds the arrays from the row of every entry. Entries keep their
+         order within a row."""
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        order = numpy.argsort(rows, kind='mergesort')
+        counts = numpy.bincount(rows, minlength=num_rows)
+        indptr = numpy.concatenate(([0], numpy.cumsum(counts)))
+        return cls(indptr, numpy.asarray(indices)[order])
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.indices[self.indptr[i]:self.indptr[i+1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def lengths(self):
+        """Number of entries in every row"""
+        return numpy.diff(self.indptr)
+
+    def rows(self):
+        """Row of every entry"""
+        return numpy.repeat(numpy.arange(len(self), dtype=numpy.int32), self.lengths())
+
+    def take(self, rows):
+        """The given rows, as a CSR of their own"""
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        positions = numpy.arange(indptr[-1]) + numpy.repeat(starts - indptr[:-1], lengths)
+        return CSR(indptr, self.indices[positions])
+
+    def levels(self, transposed=None):
+        """Rows in dependency order, for rows whose entries are rows and form
+         no cycles: a list of arrays of rows, the entries of each in earlier
+         arrays (those of the first have none). transposed is built if not
+         given."""
+        if transposed is None:
+            transposed = self.transpose(len(self))
+        remaining = self.lengths()
+        level = numpy.flatnonzero(remaining == 0)
+        levels = []
+        while len(level):
+            levels.append(level)
+            dependents = transposed.take(level).indices
+            numpy.subtract.at(remaining, dependents, 1)
+            dependents = numpy.unique(dependents)
+            level = dependents[remaining[dependents] == 0]
+        return levels
+
+    def transpose(self, num_columns=None):
+        """Reverse index: for every column, the rows in which it appears"""
+        if num_columns is None:
+            num_columns = int(self.indices.max()) + 1 if len(self.indices) else 0
+        return CSR.from_rows(self.indices, self.rows(), num_columns)
+
+    def tolists(self):
+        """The rows as a list of lists"""
+        return [row.tolist() for row in self]
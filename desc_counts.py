@@ -1,6 +1,5 @@
-import patents
-import keywords
-import networkanalysis
+import pipeline
+import sweep
 import time
 import csv
 
@@ -25,90 +24,66 @@ class Testing(object):
       self.cites_exp = cites_exp
     
     def lets_cite(self):
-      self.some_patents = patents.PrefAging(num_records=self.num_records, 
-                                            num_parents=self.num_parents,
-                                            dist = self.dist,
-                                            min_parents = 0, 
-                                            gen_len=self.gen_len,
-                                            age_exp = self.age_exp,
-                                            cites_exp = self.cites_exp
-                                            )
-                                       
-      self.some_patents.form_patents()
-
-      self.some_patents.write_count()
-      self.some_patents.cleanup()
+      self.some_patents = pipeline.cite(self.num_records, self.num_parents,
+                                        self.dist, self.gen_len,
+                                        self.age_exp, self.cites_exp)
 
     def lets_keyword(self):
-      self.key_up = keywords.Keywords(num_records = self.num_records,
-                             num_traits=self.num_traits,
-                             avg=False,
-                             min_traits=0,
-                             num_keywords=self.num_keywords,
-                             gen_len=self.num_traits)
-                             
-      self.key_up.assign_keywords()
-      #print('Finished assigning keywords')
-      self.key_up.write_phenomes()
+      self.key_up = pipeline.keyword(self.num_records, self.num_traits,
+                                     self.num_keywords)
 
     def lets_network_and_analyze(self):
-      self.na = networkanalysis.NetworkAnalysis('parentage.csv',
-                                'phenomes.csv',
-                                'final_count.csv',
-                                num_traits=self.num_traits, 
-                                num_keywords=self.num_keywords,
-                                gen_len=self.gen_len)
+      self.na = pipeline.analyze(self.some_patents, self.key_up,
+                                 self.num_traits, self.num_keywords,
+                                 self.gen_len)
                                 
       self.na.first_degree_chains()
      # self.na.write_inheritance_count()
 
       
-      xs = [len(descendents) for descendents in self.na.descendents[0:20]]
+      xs = self.na.descendant_counts(range(20)).tolist()
       xs.sort()
       return(xs)
 
-start_time = time.time()
+def descendant_counts(**params):
+  """Sorted descendant counts of the first generation of one replicate"""
+  test = Testing(**params)
+  test.lets_cite()
+  test.lets_keyword()
+  return test.lets_network_and_analyze()
+
+if __name__ == '__main__':
+  start_time = time.time()
+
+  num_records = 200
+  dist = 'poisson'
+  gen_len = 20
+  num_traits = 1
+  num_keywords = 2
 
-num_records = 200
-num_parents = 1
-dist = 'poisson'
-gen_len = 20
-num_traits = 1
-num_keywords = 2
-age_exp = 0
-cites_exp = 0
 
+  desc_counts = [[] for i in range(2000)]
+  """
+  with open('max.csv', 'rb') as f:
+    for row in csv.reader(f):
+      maxes.append(row)
+  """
+  constants = dict(num_records=num_records, dist=dist, gen_len=gen_len,
+                   num_traits=num_traits, num_keywords=num_keywords)
+  num_ps = [1,2,4,8,16]
+  grid = [('num_parents', num_ps), ('age_exp', range(4)), ('cites_exp', range(4))]
 
-desc_counts = [[] for i in range(2000)]
-"""
-with open('max.csv', 'rb') as f:
-  for row in csv.reader(f):
-    maxes.append(row)
-"""
-count = 0
-num_ps = [1,2,4,8,16]
-for num_p in num_ps:
-  num_parents = num_p
-  for i in range(4):
-    age_exp = i
-    for j in range(4):
-      cites_exp = j
-          
-      for k in range(100):
-        test = Testing(num_records, num_parents, dist, gen_len, num_traits, 
-                       num_keywords, age_exp, cites_exp)
-        test.lets_cite()
-        test.lets_keyword()
-        these_counts = test.lets_network_and_analyze()
-        desc_counts[count].extend(these_counts)
+  results = sweep.sweep(descendant_counts, grid, replicates=100, constants=constants)
+  for count, (params, replicates) in enumerate(results):
+    for these_counts in replicates:
+      desc_counts[count].extend(these_counts)
 
-      count += 1
-      print('Finished %d_%d-%d' % (num_parents, cites_exp, age_exp))
+    print('Finished %d_%d-%d' % (params['num_parents'], params['cites_exp'], params['age_exp']))
 
-counts_file = open('desc_counts.csv', 'w')
-counts_writer = csv.writer(counts_file)
+  counts_file = open('desc_counts.csv', 'w')
+  counts_writer = csv.writer(counts_file)
 
-counts_writer.writerows(desc_counts)
+  counts_writer.writerows(desc_counts)
 
-elapsed_time = (time.time() - start_time) / 60
-print(elapsed_time)
\ No newline at end of file
+  elapsed_time = (time.time() - start_time) / 60
+  print(elapsed_time)
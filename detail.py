@@ -0,0 +1,118 @@
+import numpy
+import citations
+
+
+
+def top_descendants(counts, budget, nodes=None):
+    """The budget patents (of nodes, a boolean mask, if given) with the most
+     descendants by counts, older first among ties, as a boolean mask. A
+     parent has more descendants than any of its children, so with exact
+     counts the patents kept cite only patents kept, up to ties."""
+    candidates = numpy.arange(len(counts)) if nodes is None else numpy.flatnonzero(nodes)
+    order = numpy.lexsort((candidates, -numpy.asarray(counts)[candidates]))
+    chosen = numpy.zeros(len(counts), dtype=bool)
+    chosen[candidates[order[:budget]]] = True
+    return chosen
+
+def stratified(num_records, gen_len, budget, nodes=None, scores=None):
+    """About budget patents (of nodes, if given) spread evenly over the
+     generations, as a boolean mask: each band of consecutive generations
+     (one generation each, unless there are more than budget) keeps its
+     share, those with the highest scores if given or else at random"""
+    candidates = numpy.arange(num_records) if nodes is None else numpy.flatnonzero(nodes)
+    num_gens = max(-(-num_records // gen_len), 1)
+    num_bands = max(min(num_gens, budget), 1)
+    quotas = numpy.full(num_bands, budget // num_bands, dtype=numpy.int64)
+    quotas[:budget % num_bands] += 1
+
+    bands = (candidates // gen_len) * num_bands // num_gens
+    if scores is None:
+        priority = numpy.random.random(len(candidates))
+    else:
+        priority = -numpy.asarray(scores, dtype=float)[candidates]
+    order = numpy.lexsort((candidates, priority, bands))
+    # rank of each candidate in its band
+    sorted_bands = bands[order]
+    firsts = numpy.searchsorted(sorted_bands, sorted_bands)
+    ranks = numpy.arange(len(order)) - firsts
+
+    chosen = numpy.zeros(num_records, dtype=bool)
+    chosen[candidates[order[ranks < quotas[sorted_bands]]]] = True
+    return chosen
+
+def collapse_chains(graph, inheriting):
+    """The graph with every chain of patents that each cite and are cited
+     once, inheriting nothing either way (inheriting: whether each citation
+     of graph.edges() shares keywords), cut out: the patent under a chain
+     cites the one above it instead. Returns the patents left, as a boolean
+     mask, and the citations among them as a citations.CitationGraph of
+     every patent."""
+    children, parents = [ends.astype(numpy.int64) for ends in graph.edges()]
+    inheriting = numpy.asarray(inheriting, dtype=bool)
+    num_records = len(graph)
+    num_parents = numpy.bincount(children, minlength=num_records)
+    num_children = numpy.bincount(parents, minlength=num_records)
+    inherits = (numpy.bincount(children[inheriting], minlength=num_records) +
+                numpy.bincount(parents[inheriting], minlength=num_records)) > 0
+    chain = (num_parents == 1) & (num_children == 1) & ~inherits
+
+    # the first patent above each that is not in a chain, by pointer jumping
+    above = numpy.arange(num_records)
+    linked = chain[children]
+    above[children[linked]] = parents[linked]
+    while chain[above[chain]].any():
+        above[chain] = above[above[chain]]
+
+    kept = ~chain[children]
+    keys = numpy.unique(children[kept] * num_records + above[parents[kept]])
+    return ~chain, citations.CitationGraph.from_rows(keys // num_records, keys % num_records,
+                                                     num_records)
+
+#==============================================================================
+# layouts
+#==============================================================================
+def grid_positions(ids, starting_node, nodes_per_gen, xmax, ymax, starting_y, num_rows, rows=None):
+    """Positions of patents ids in a grid from starting_node on, a row of
+     nodes_per_gen spanning xmax inches per generation and num_rows rows
+     spanning ymax, the first at starting_y. rows, if given, is the row of
+     each patent in place of its generation's (see compact_rows). Returns
+     their x and y."""
+    ids = numpy.asarray(ids, dtype=numpy.int64)
+    xincr = float(xmax) / (nodes_per_gen - 1)
+    yincr = float(ymax) / (num_rows - 1)
+    gens = ids // nodes_per_gen - starting_node // nodes_per_gen
+    # the first row starts at starting_node, the others at their first patent
+    columns = numpy.where(gens == 0, ids - starting_node, ids % nodes_per_gen)
+    if rows is None:
+        rows = gens
+    return columns * xincr, starting_y - numpy.asarray(rows) * yincr
+
+def compact_rows(ids, nodes_per_gen):
+    """Row of each of patents ids when only the generations that hold any of
+     them get rows, in order, and the number of those rows: a reduced
+     network (see top_descendants) keeps few of its generations"""
+    gens, rows = numpy.unique(numpy.asarray(ids, dtype=numpy.int64) // nodes_per_gen,
+                              return_inverse=True)
+    return rows.reshape(-1), len(gens)
+
+def pyramid_positions(limits, xmax, ymax, num_rows):
+    """Positions of patent 0 at the top of a pyramid and of the patents of
+     each of limits, a (first, stop) range per row, below it on rows
+     widening to meet the first row of a grid of num_rows rows spanning
+     xmax by ymax inches. Returns the patents, their x and y, and the y of
+     the row after."""
+    xmax = float(xmax)
+    ymax = float(ymax)
+    yincr = ymax / (num_rows - 1)
+
+    ids, x, y = [numpy.zeros(1, dtype=numpy.int64)], [numpy.array([xmax / 2])], [numpy.array([ymax])]
+    for row, (range_min, range_max) in enumerate(limits, 1):
+        # outermost nodes are on the lines from the origin to the outermost
+        # nodes of the first generation of the rectangular grid (a'b/a = b')
+        row_width = (row * yincr * xmax) / (yincr * (len(limits) + 1))
+        columns = numpy.arange(range_max - range_min)
+        ids.append(range_min + columns)
+        x.append(xmax / 2 - row_width / 2 + columns * (row_width / (range_max - range_min - 1)))
+        y.append(numpy.full(len(columns), ymax - row * yincr))
+    return (numpy.concatenate(ids), numpy.concatenate(x), numpy.concatenate(y),
+            ymax - (len(limits) + 1) * yincr)
@@ -0,0 +1,136 @@
+import gzip
+import random
+import numpy
+
+
+
+# for multi-colored inheritance layers. Greys, black and white removed.
+RAINBOW = ["red", "yellow", "orange", "green", "blue", "purple"]
+SVG = ["aliceblue", "antiquewhite", "aqua", "aquamarine", "beige", "blue", "blueviolet", "brown", "burlywood", "cadetblue", "chartreuse", "chocolate", "coral", "cornflowerblue", "cornsilk", "crimson", "cyan", "darkblue", "darkcyan", "darkgoldenrod", "darkgray", "darkgreen", "darkgrey", "darkkhaki", "darkmagenta", "darkolivegreen", "darkorange", "darkorchid", "darkred", "darksalmon", "darkseagreen", "darkslateblue", "darkslategray", "darkturquoise", "darkviolet", "deeppink", "deepskyblue", "dimgray", "dodgerblue", "firebrick", "forestgreen", "fuchsia", "gainsboro", "gold", "goldenrod", "gray", "green", "greenyellow", "hotpink", "indianred", "indigo", "khaki", "lavender", "lavenderblush", "lawngreen", "lemonchiffon", "lightblue", "lightcoral", "lightcyan", "lightgoldenrodyellow", "lightgray", "lightgreen", "lightgrey", "lightpink", "lightsalmon", "lightseagreen", "lightskyblue", "lightslategray", "lightsteelblue", "lightyellow", "lime", "limegreen", "linen", "magenta", "maroon", "mediumaquamarine", "mediumblue", "mediumorchid", "mediumpurple", "mediumseagreen", "mediumslateblue", "mediumspringgreen", "mediumturquoise", "mediumvioletred", "midnightblue", "mistyrose", "moccasin", "navajowhite", "navy", "oldlace", "olive", "olivedrab", "orange", "orangered", "orchid", "palegoldenrod", "palegreen", "paleturquoise", "palevioletred", "papayawhip", "peachpuff", "peru", "pink", "plum", "powderblue", "purple", "red", "rosybrown", "royalblue", "saddlebrown", "salmon", "sandybrown", "seagreen", "seashell", "sienna", "silver", "skyblue", "slateblue", "slategray", "slategrey", "springgreen", "steelblue", "tan", "teal", "thistle", "tomato", "turquoise", "violet", "wheat", "whitesmoke", "yellow", "yellowgreen"]
+X11 = ["aliceblue", "antiquewhite", "antiquewhite1", "antiquewhite2", "antiquewhite3", "antiquewhite4", "aquamarine", "aquamarine1", "aquamarine2", "aquamarine3", "aquamarine4", "azure", "azure1", "azure2", "azure3", "azure4", "beige", "bisque", "bisque1", "bisque2", "bisque3", "bisque4", "blanchedalmond", "blue", "blue1", "blue2", "blue3", "blue4", "blueviolet", "brown", "brown1", "brown2", "brown3", "brown4", "burlywood", "burlywood1", "burlywood2", "burlywood3", "burlywood4", "cadetblue", "cadetblue1", "cadetblue2", "cadetblue3", "cadetblue4", "chartreuse", "chartreuse1", "chartreuse2", "chartreuse3", "chartreuse4", "chocolate", "chocolate1", "chocolate2", "chocolate3", "chocolate4", "coral", "coral1", "coral2", "coral3", "coral4", "cornflowerblue", "cornsilk", "cornsilk1", "cornsilk2", "cornsilk3", "cornsilk4", "crimson", "cyan", "cyan1", "cyan2", "cyan3", "cyan4", "darkgoldenrod", "darkgoldenrod1", "darkgoldenrod2", "darkgoldenrod3", "darkgoldenrod4", "darkgreen", "darkkhaki", "darkolivegreen", "darkolivegreen1", "darkolivegreen2", "darkolivegreen3", "darkolivegreen4", "darkorange", "darkorange1", "darkorange2", "darkorange3", "darkorange4", "darkorchid", "darkorchid1", "darkorchid2", "darkorchid3", "darkorchid4", "darksalmon", "darkseagreen", "darkseagreen1", "darkseagreen2", "darkseagreen3", "darkseagreen4", "darkslateblue", "darkslategray", "darkslategray1", "darkslategray2", "darkslategray3", "darkslategray4", "darkslategrey", "darkturquoise", "darkviolet", "deeppink", "deeppink1", "deeppink2", "deeppink3", "deeppink4", "deepskyblue", "deepskyblue1", "deepskyblue2", "deepskyblue3", "deepskyblue4", "dimgray", "dimgrey", "dodgerblue", "dodgerblue1", "dodgerblue2", "dodgerblue3", "dodgerblue4", "firebrick", "firebrick1", "firebrick2", "firebrick3", "firebrick4", "floralwhite", "forestgreen", "gainsboro", "ghostwhite", "gold", "gold1", "gold2", "gold3", "gold4", "goldenrod", "goldenrod1", "goldenrod2", "goldenrod3", "goldenrod4", "honeydew", "honeydew1", "honeydew2", "honeydew3", "honeydew4", "hotpink", "hotpink1", "hotpink2", "hotpink3", "hotpink4", "indianred", "indianred1", "indianred2", "indianred3", "indianred4", "indigo", "invis", "ivory", "ivory1", "ivory2", "ivory3", "ivory4", "khaki", "khaki1", "khaki2", "khaki3", "khaki4", "lavender", "lavenderblush", "lavenderblush1", "lavenderblush2", "lavenderblush3", "lavenderblush4", "lawngreen", "lemonchiffon", "lemonchiffon1", "lemonchiffon2", "lemonchiffon3", "lemonchiffon4", "lightblue", "lightblue1", "lightblue2", "lightblue3", "lightblue4", "lightcoral", "lightcyan", "lightcyan1", "lightcyan2", "lightcyan3", "lightcyan4", "lightgoldenrod", "lightgoldenrod1", "lightgoldenrod2", "lightgoldenrod3", "lightgoldenrod4", "lightgoldenrodyellow", "lightgray", "lightgrey", "lightpink", "lightpink1", "lightpink2", "lightpink3", "lightpink4", "lightsalmon", "lightsalmon1", "lightsalmon2", "lightsalmon3", "lightsalmon4", "lightseagreen", "lightskyblue", "lightskyblue1", "lightskyblue2", "lightskyblue3", "lightskyblue4", "lightslateblue", "lightslategray", "lightslategrey", "lightsteelblue", "lightsteelblue1", "lightsteelblue2", "lightsteelblue3", "lightsteelblue4", "lightyellow", "lightyellow1", "lightyellow2", "lightyellow3", "lightyellow4", "limegreen", "linen", "magenta", "magenta1", "magenta2", "magenta3", "magenta4", "maroon", "maroon1", "maroon2", "maroon3", "maroon4", "mediumaquamarine", "mediumblue", "mediumorchid", "mediumorchid1", "mediumorchid2", "mediumorchid3", "mediumorchid4", "mediumpurple", "mediumpurple1", "mediumpurple2", "mediumpurple3", "mediumpurple4", "mediumseagreen", "mediumslateblue", "mediumspringgreen", "mediumturquoise", "mediumvioletred", "midnightblue", "mintcream", "mistyrose", "mistyrose1", "mistyrose2", "mistyrose3", "mistyrose4", "moccasin", "navajowhite", "navajowhite1", "navajowhite2", "navajowhite3", "navajowhite4", "navy", "navyblue", "none", "oldlace", "olivedrab", "olivedrab1", "olivedrab2", "olivedrab3", "olivedrab4", "orange", "orange1", "orange2", "orange3", "orange4", "orangered", "orangered1", "orangered2", "orangered3", "orangered4", "orchid", "orchid1", "orchid2", "orchid3", "orchid4", "palegoldenrod", "palegreen", "palegreen1", "palegreen2", "palegreen3", "palegreen4", "paleturquoise", "paleturquoise1", "paleturquoise2", "paleturquoise3", "paleturquoise4", "palevioletred", "palevioletred1", "palevioletred2", "palevioletred3", "palevioletred4", "papayawhip", "peachpuff", "peachpuff1", "peachpuff2", "peachpuff3", "peachpuff4", "peru", "pink", "pink1", "pink2", "pink3", "pink4", "plum", "plum1", "plum2", "plum3", "plum4", "powderblue", "purple", "purple1", "purple2", "purple3", "purple4", "red", "red1", "red2", "red3", "red4", "rosybrown", "rosybrown1", "rosybrown2", "rosybrown3", "rosybrown4", "royalblue", "royalblue1", "royalblue2", "royalblue3", "royalblue4", "saddlebrown", "salmon", "salmon1", "salmon2", "salmon3", "salmon4", "sandybrown", "seagreen", "seagreen1", "seagreen2", "seagreen3", "seagreen4", "seashell", "seashell1", "seashell2", "seashell3", "seashell4", "sienna", "sienna1", "sienna2", "sienna3", "sienna4", "skyblue", "skyblue1", "skyblue2", "skyblue3", "skyblue4", "slateblue", "slateblue1", "slateblue2", "slateblue3", "slateblue4", "slategray", "slategray1", "slategray2", "slategray3", "slategray4", "slategrey", "snow", "snow1", "snow2", "snow3", "snow4", "springgreen", "springgreen1", "springgreen2", "springgreen3", "springgreen4", "steelblue", "steelblue1", "steelblue2", "steelblue3", "steelblue4", "tan", "tan1", "tan2", "tan3", "tan4", "thistle", "thistle1", "thistle2", "thistle3", "thistle4", "tomato", "tomato1", "tomato2", "tomato3", "tomato4", "transparent", "turquoise", "turquoise1", "turquoise2", "turquoise3", "turquoise4", "violet", "violetred", "violetred1", "violetred2", "violetred3", "violetred4", "wheat", "wheat1", "wheat2", "wheat3", "wheat", "whitesmoke", "yellow", "yellow1", "yellow2", "yellow3", "yellow4", "yellowgreen"]
+PALETTES = {'rainbow': RAINBOW, 'svg': SVG, 'x11': X11}
+
+
+def colors(palette="rainbow"):
+    """The colors of a palette ('rainbow', 'svg' or 'x11'; rainbow if
+     unknown) in a random order of their own"""
+    colors = list(PALETTES.get(palette, RAINBOW))
+    random.shuffle(colors)
+    return colors
+
+
+class DotWriter(object):
+    """Writes a Graphviz DOT graph as it goes, through a buffer of about
+    buffer_size characters, gzipped if compress (by default if path ends in
+    .gz). Nodes, ranks and edges come as arrays of ids and are formatted
+    chunk ids at a time, so writing takes no more memory than the arrays.
+
+        with dot.DotWriter(path, header) as writer:
+            writer.guide(len(generations))
+            writer.ranks(generations)
+            writer.edges(parents, children, '%d -> %d;\\n')
+    """
+
+    def __init__(self, path, header='', compress=None, buffer_size=2**22, chunk=2**16):
+        if compress is None:
+            compress = path.endswith('.gz')
+        # zlib's default level: most of the size at a fraction of the time
+        self.file = gzip.open(path, 'wb', 6) if compress else open(path, 'wb')
+        self.buffer_size = buffer_size
+        self.chunk = chunk
+        self.pending = []
+        self.buffered = 0
+        self.write('digraph inheritance {\n' + header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, text):
+        self.pending.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        data = ''.join(self.pending)
+        if not isinstance(data, bytes):
+            data = data.encode('ascii')
+        self.file.write(data)
+        self.pending = []
+        self.buffered = 0
+
+    def close(self):
+        """Closes the graph and the file"""
+        self.write('}\n')
+        self.flush()
+        self.file.close()
+
+    def guide(self, num_ranks):
+        """An invisible chain through the rank groups gen_0 to
+         gen_<num_ranks-1>, which keeps them in order"""
+        self.write('/*guide*/ { node [color=invis, fillcolor = invis]; edge [style=invis]; ')
+        self.write(' -> '.join('gen_%d' % i for i in range(num_ranks)))
+        self.write(';}\n')
+
+    def ranks(self, groups):
+        """A rank group gen_i holding the nodes groups[i], for every i"""
+        for i, group in enumerate(groups):
+            self.write('{ rank = same; gen_%d; ' % i)
+            self.write(''.join('%d; ' % node for node in numpy.asarray(group).tolist()))
+            self.write('}\n')
+
+    def nodes(self, ids, attributes):
+        """Gives each node of ids the attributes, such as
+         '[color = red, fillcolor = red]'"""
+        ids = numpy.asarray(ids, dtype=numpy.int64)
+        for start in range(0, len(ids), self.chunk):
+            self.write(fill('%d ' + attributes + '\n', ids[start:start + self.chunk]))
+
+    def positions(self, ids, x, y):
+        """Pins each node of ids at (x, y), in inches"""
+        ids = numpy.asarray(ids, dtype=numpy.int64)
+        for start in range(0, len(ids), self.chunk):
+            stop = start + self.chunk
+            self.write(fill('%d [pos="%s, %s!"];\n', ids[start:stop],
+                            decimals(x[start:stop]), decimals(y[start:stop])))
+
+    def edges(self, tails, heads, templates, kinds=None, ordered=True):
+        """An edge from tails[e] to heads[e] for every e, formatted with
+         templates[kinds[e]] (or with templates, if one template), which
+         takes the two ids. Edges go by kind, then tail, then head, unless
+         not ordered."""
+        if isinstance(templates, str):
+            templates = [templates]
+        tails = numpy.asarray(tails, dtype=numpy.int64)
+        heads = numpy.asarray(heads, dtype=numpy.int64)
+        if kinds is None:
+            kinds = numpy.zeros(len(tails), dtype=numpy.int64)
+        kinds = numpy.asarray(kinds, dtype=numpy.int64)
+        if ordered:
+            order = numpy.lexsort((heads, tails, kinds))
+            tails, heads, kinds = tails[order], heads[order], kinds[order]
+
+        # runs of edges of one kind, at most chunk long
+        bounds = numpy.union1d(numpy.flatnonzero(numpy.diff(kinds)) + 1,
+                               numpy.arange(0, len(kinds) + 1, self.chunk))
+        bounds = numpy.union1d(bounds, [len(kinds)]).tolist()
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            self.write(fill(templates[kinds[start]], tails[start:stop], heads[start:stop]))
+
+
+def fill(template, *columns):
+    """template formatted with the values of each row of columns in turn,
+     all at once"""
+    values = [None] * (len(columns[0]) * len(columns))
+    for i, column in enumerate(columns):
+        values[i::len(columns)] = numpy.asarray(column).tolist()
+    return (template * len(columns[0])) % tuple(values)
+
+def decimals(values):
+    """'%f' of each of values, formatting each distinct value once (a grid
+     has few)"""
+    distinct, which = numpy.unique(values, return_inverse=True)
+    return numpy.array(['%f' % value for value in distinct.tolist()], dtype=object)[which]
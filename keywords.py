@@ -1,12 +1,84 @@
 import csv
+import numbers
 import os
 import numpy
+import csr
+import lazy
 import rwg
-from random import randint
 
 
 
 
+class Phenomes(csr.CSR, lazy.Lazy):
+    """Keywords of every record as CSR arrays: the keywords of record i are
+    keywords[indptr[i]:indptr[i+1]], distinct and sorted"""
+
+    @property
+    def keywords(self):
+        return self.indices
+
+    def frozensets(self):
+        """The phenomes as a list of frozensets, one per record"""
+        return [frozenset(keywords) for keywords in self.tolists()]
+
+    @lazy.derived('indptr', 'indices')
+    def width(self):
+        """More than the highest keyword"""
+        return int(self.indices.max()) + 1 if len(self.indices) else 1
+
+    @lazy.derived('indptr', 'indices')
+    def keys(self):
+        """record * width + keyword for every keyword of every record, sorted"""
+        return numpy.sort(self.rows().astype(numpy.int64) * self.width + self.indices)
+
+    @lazy.derived('indptr', 'indices')
+    def sorted_rows(self):
+        """The keywords of every record in order, as a CSR"""
+        return csr.CSR(self.indptr, self.keys % self.width)
+
+    @lazy.derived('indptr', 'indices')
+    def records(self):
+        """Inverted index: the records with keyword k are records[k], sorted,
+        as a CSR of every keyword up to width"""
+        return self.transpose(self.width)
+
+    def carrying(self, keywords):
+        """Sorted array of the records with any of keywords, from the
+         inverted index"""
+        keywords = [int(keyword) for keyword in keywords
+                    if isinstance(keyword, numbers.Integral) and 0 <= keyword < self.width]
+        return numpy.unique(self.records.take(keywords).indices).astype(numpy.int64)
+
+    def top(self, n):
+        """The n keywords with the most records, as (keyword, number of
+         records) pairs, most first and lower keywords first among ties"""
+        counts = self.records.lengths()
+        best = numpy.lexsort((numpy.arange(len(counts)), -counts))[:max(n, 0)]
+        return list(zip(best.tolist(), counts[best].tolist()))
+
+    def shared(self, a, b, keywords=None):
+        """Pair and keyword of every keyword records a[e] and b[e] share,
+         for every pair e, by pair and then keyword: each keyword of a[e] is
+         looked up among the sorted keys. Only keywords in keywords count,
+         if given."""
+        a = numpy.asarray(a, dtype=numpy.int64)
+        b = numpy.asarray(b, dtype=numpy.int64)
+        keys, rows = self.keys, self.sorted_rows
+        if keywords is not None:
+            keys = keys[numpy.isin(rows.indices, list(keywords))]
+            lengths = numpy.bincount(keys // self.width, minlength=len(self))
+            rows = csr.CSR(numpy.concatenate(([0], numpy.cumsum(lengths))), keys % self.width)
+        if not len(keys):
+            nothing = numpy.zeros(0, dtype=numpy.int64)
+            return nothing, nothing
+
+        candidates = rows.take(a)
+        pairs = candidates.rows()
+        wanted = b[pairs] * self.width + candidates.indices
+        found = keys[numpy.minimum(numpy.searchsorted(keys, wanted), len(keys) - 1)] == wanted
+        return pairs[found], candidates.indices[found].astype(numpy.int64)
+
+
 class Keywords(object):
 
     def __init__(self, keywords_file=None, num_records=1000, num_traits=5, avg=True, min_traits=0, num_keywords=100, gen_len=100):
@@ -45,7 +117,7 @@ class Keywords(object):
         self.probs = [weight/float(summed_weights) for weight in keyword_weights]
 
     def define_phenomes(self):
-        self.phenomes = []
+        self.phenomes = Phenomes.from_lists([])
     
     def open_files(self):
         """Opens the csv to which the phenomes will be written"""
@@ -71,35 +143,63 @@ class Keywords(object):
          been assigned to that patent."""
         with open('phenomes.csv', 'w') as f:
             writer = csv.writer(f)
-            list_of_lists = [list(i) for i in self.phenomes]
-            writer.writerows(list_of_lists)
+            writer.writerows(self.phenomes.tolists())
             
 #==============================================================================
 # assignment
 #==============================================================================
     def assign_keywords(self):
-        """Assigns keywords to each patent"""
-        self.new_pool()
-        for i in range(self.num_records):
-            
-            if self.pool < self.num_traits*5:
-                self.new_pool()            
-            traits = set()
-            while len(traits) < randint(self.min_traits, self.max_traits):
-                trait = self.pool.pop(0)
-                traits.add(trait)
-            
-            self.phenomes.append(frozenset(traits))
-            
-            if i % self.gen_len == 0:
-                self.new_pool()   
-                
-    def new_pool(self):
-        """Generates the pool of keywords from which traits will be
-         assigned"""
-        if self.keywords_file:
-            n = self.gen_len * self.num_traits * 2
-            self.pool = rwg.generate(n, self.weights)
+        """Assigns keywords to every patent at once. Each gets a number of
+         distinct traits between min_traits and max_traits (no more than
+         there are keywords to draw from)."""
+        x = numpy.random.randint(self.min_traits, self.max_traits+1, self.num_records)
+        x = numpy.minimum(x, self.num_choices())
+        width = x.max() if self.num_records else 0
+
+        # one row of traits per patent, the columns past its own number of
+        # traits filled with a sentinel that sorts last
+        sentinel = numpy.iinfo(numpy.int32).max
+        if self.num_choices() <= 2 * width:
+            traits = self.ranked_draws(width)
         else:
-            n = self.num_traits * 1000 * 2
-            self.pool = list(numpy.random.randint(0, self.num_keywords, n))
\ No newline at end of file
+            traits = self.draw(self.num_records * width).reshape(self.num_records, width)
+        traits[numpy.arange(width) >= x[:, None]] = sentinel
+
+        # duplicates are drawn again until every trait in a row is distinct,
+        # going back over only the rows that had any
+        rows = numpy.arange(self.num_records)
+        while len(rows):
+            redrawn = traits[rows]
+            redrawn.sort(axis=1)
+            duplicate = (redrawn[:, 1:] == redrawn[:, :-1]) & (redrawn[:, 1:] < sentinel)
+            redrawn[:, 1:][duplicate] = self.draw(numpy.count_nonzero(duplicate))
+            traits[rows] = redrawn
+            rows = rows[duplicate.any(axis=1)]
+
+        indptr = numpy.concatenate(([0], numpy.cumsum(x)))
+        self.phenomes = Phenomes(indptr, traits[traits < sentinel])
+
+    def keyword_weights(self):
+        """Relative chance of drawing each keyword"""
+        if self.keywords_file:
+            return numpy.asarray(self.probs, dtype=float)
+        return numpy.ones(self.num_keywords)
+
+    def num_choices(self):
+        """Number of keywords that can be drawn"""
+        return numpy.count_nonzero(self.keyword_weights())
+
+    def draw(self, n):
+        """Draws n keywords with replacement"""
+        if self.keywords_file:
+            return rwg.generate_pool(n, self.probs).astype(numpy.int32)
+        return numpy.random.randint(0, self.num_keywords, n).astype(numpy.int32)
+
+    def ranked_draws(self, width):
+        """The first width keywords of a weighted random ordering of all of
+         them, for every patent. Distinct from the start, which pays off when
+         there are few keywords and redrawing duplicates would take long."""
+        with numpy.errstate(divide='ignore'):
+            keys = numpy.random.exponential(size=(self.num_records, len(self.keyword_weights())))
+            keys /= self.keyword_weights()
+        return numpy.argsort(keys, axis=1)[:, :width].astype(numpy.int32)
@@ -0,0 +1,58 @@
+class derived(object):
+    """Decorator making a method an attribute computed on first access and
+    then kept in the instance, so it is read like any other. In a Lazy
+    class, assigning any of the attributes named in inputs drops it, to be
+    computed again on next access. Assigning the attribute keeps the
+    assigned value instead, on the same terms, and deleting it drops it.
+
+        class Analysis(lazy.Lazy):
+            @lazy.derived('parentage')
+            def children(self):
+                return self.parentage.transpose()
+    """
+
+    def __init__(self, *inputs):
+        self.inputs = inputs
+
+    def __call__(self, method):
+        self.method = method
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
+        return self
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = self.method(obj)
+        obj.__dict__[self.name] = value
+        return value
+
+
+class Lazy(object):
+    """Base for classes with derived attributes: assigning an attribute drops
+    every attribute derived from it, and from those, and so on"""
+
+    # for every class, the derived attributes of each input
+    dependents = {}
+
+    @classmethod
+    def derived_from(cls):
+        if cls not in Lazy.dependents:
+            dependents = {}
+            for klass in reversed(cls.__mro__):
+                for attribute in vars(klass).values():
+                    if isinstance(attribute, derived):
+                        for name in attribute.inputs:
+                            dependents.setdefault(name, []).append(attribute.name)
+            Lazy.dependents[cls] = dependents
+        return Lazy.dependents[cls]
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        self.drop_derived(name)
+
+    def drop_derived(self, name):
+        """Drops what is derived from attribute name"""
+        for dependent in type(self).derived_from().get(name, ()):
+            self.__dict__.pop(dependent, None)
+            self.drop_derived(dependent)
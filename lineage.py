@@ -0,0 +1,80 @@
+import collections
+import numpy
+
+
+
+class LRUCache(object):
+    """Mapping that keeps only its maxsize most recently used entries"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        value = self.entries.pop(key)
+        self.entries[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.entries.pop(key, None)
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+def reachable(rows, sources):
+    """Sorted array of every row reachable from sources (one row or many) in
+     a graph of CSR rows whose entries are rows, found breadth first"""
+    seen = numpy.zeros(len(rows), dtype=bool)
+    frontier = numpy.unique(numpy.asarray(sources, dtype=numpy.int64))
+    found = [numpy.zeros(0, dtype=numpy.int64)]
+    while len(frontier):
+        frontier = rows.take(frontier).indices
+        frontier = numpy.unique(frontier[~seen[frontier]])
+        seen[frontier] = True
+        found.append(frontier)
+    return numpy.sort(numpy.concatenate(found)).astype(numpy.int64)
+
+
+class Relatives(object):
+    """The rows reachable from every row of a graph, found on first use:
+    over a CitationGraph relatives[i] is the sorted array of the ancestors of
+    patent i, over graph.children() of its descendants. A search visits only
+    what it reaches and the last cache_size results are kept (see
+    closure.Closure for every row at once)."""
+
+    def __init__(self, rows, cache_size=1024):
+        self.rows = rows
+        self.cache = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = int(i)
+        if i in self.cache:
+            return self.cache[i]
+        found = self.cache[i] = reachable(self.rows, i)
+        return found
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def of(self, ids):
+        """The relatives of each of ids"""
+        return [self[i] for i in ids]
+
+    def counts(self, ids=None):
+        """Number of relatives of each of ids (default: every row)"""
+        if ids is None:
+            ids = range(len(self))
+        return numpy.array([len(self[i]) for i in ids], dtype=numpy.int64)
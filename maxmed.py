@@ -1,6 +1,5 @@
-import patents
-import keywords
-import networkanalysis
+import pipeline
+import sweep
 import time
 import csv
 
@@ -25,44 +24,23 @@ class Testing(object):
       self.cites_exp = cites_exp
     
     def lets_cite(self):
-      self.some_patents = patents.PrefAging(num_records=self.num_records, 
-                                            num_parents=self.num_parents,
-                                            dist = self.dist,
-                                            min_parents = 0, 
-                                            gen_len=self.gen_len,
-                                            age_exp = self.age_exp,
-                                            cites_exp = self.cites_exp
-                                            )
-                                       
-      self.some_patents.form_patents()
-
-      self.some_patents.write_count()
-      self.some_patents.cleanup()
+      self.some_patents = pipeline.cite(self.num_records, self.num_parents,
+                                        self.dist, self.gen_len,
+                                        self.age_exp, self.cites_exp)
 
     def lets_keyword(self):
-      self.key_up = keywords.Keywords(num_records = self.num_records,
-                             num_traits=self.num_traits,
-                             avg=False,
-                             min_traits=0,
-                             num_keywords=self.num_keywords,
-                             gen_len=self.num_traits)
-                             
-      self.key_up.assign_keywords()
-      #print('Finished assigning keywords')
-      self.key_up.write_phenomes()
+      self.key_up = pipeline.keyword(self.num_records, self.num_traits,
+                                     self.num_keywords)
 
     def lets_network_and_analyze(self):
-      self.na = networkanalysis.NetworkAnalysis('parentage.csv',
-                                'phenomes.csv',
-                                'final_count.csv',
-                                num_traits=self.num_traits, 
-                                num_keywords=self.num_keywords,
-                                gen_len=self.gen_len)
+      self.na = pipeline.analyze(self.some_patents, self.key_up,
+                                 self.num_traits, self.num_keywords,
+                                 self.gen_len)
                                 
       self.na.first_degree_chains()
      # self.na.write_inheritance_count()
 
-      xs = [(len(descendents), i) for i, descendents in enumerate(self.na.descendents[0:20])]
+      xs = list(zip(self.na.descendant_counts(range(20)).tolist(), range(20)))
       xs.sort()
       return(xs[9][0], xs[10][0], xs[19][0])
       """
@@ -95,56 +73,59 @@ class Testing(object):
 #      print(self.na.inheritance_average_random())
 #      print(self.na.inheritance_average_related())
 
-start_time = time.time()
-
-num_records = 200
-num_parents = 16
-dist = 'poisson'
-gen_len = 20
-num_traits = 1
-num_keywords = 2
-age_exp = 0
-cites_exp = 0
-
-
-medians = [[] for i in range(1000)]
-maxes = [[] for i in range(1000)]
-"""
-with open('median.csv', 'rb') as f:
-  for row in csv.reader(f):
-    medians.append(row)
-
-with open('max.csv', 'rb') as f:
-  for row in csv.reader(f):
-    maxes.append(row)
-"""
-
-for i in range(4):
-  age_exp = i
-  for j in range(4):
-    cites_exp = j
-        
-    for k in range(1000):
-      test = Testing(num_records, num_parents, dist, gen_len, num_traits, 
-                     num_keywords, age_exp, cites_exp)
-      test.lets_cite()
-      test.lets_keyword()
-      x = test.lets_network_and_analyze()
-      median = (x[0] + x[1])/2
+def median_and_max(**params):
+  """Median and max descendant counts of the first generation of one replicate"""
+  test = Testing(**params)
+  test.lets_cite()
+  test.lets_keyword()
+  x = test.lets_network_and_analyze()
+  median = (x[0] + x[1])/2
+  maximum = (x[2])
+  return median, maximum
+
+if __name__ == '__main__':
+  start_time = time.time()
+
+  num_records = 200
+  num_parents = 16
+  dist = 'poisson'
+  gen_len = 20
+  num_traits = 1
+  num_keywords = 2
+
+
+  medians = [[] for i in range(1000)]
+  maxes = [[] for i in range(1000)]
+  """
+  with open('median.csv', 'rb') as f:
+    for row in csv.reader(f):
+      medians.append(row)
+
+  with open('max.csv', 'rb') as f:
+    for row in csv.reader(f):
+      maxes.append(row)
+  """
+
+  constants = dict(num_records=num_records, num_parents=num_parents, dist=dist,
+                   gen_len=gen_len, num_traits=num_traits, num_keywords=num_keywords)
+  grid = [('age_exp', range(4)), ('cites_exp', range(4))]
+
+  for params, results in sweep.sweep(median_and_max, grid, replicates=1000,
+                                     constants=constants):
+    for k, (median, maximum) in enumerate(results):
       medians[k] += [str(median)]
-      maximum = (x[2])
       maxes[k] += [str(maximum)]
 
-    print('Finished %d-%d' % (cites_exp, age_exp))
+    print('Finished %d-%d' % (params['cites_exp'], params['age_exp']))
 
-median_file = open('median.csv', 'w')
-max_file = open('max.csv', 'w')
+  median_file = open('median.csv', 'w')
+  max_file = open('max.csv', 'w')
 
-median_writer = csv.writer(median_file)
-max_writer = csv.writer(max_file)
+  median_writer = csv.writer(median_file)
+  max_writer = csv.writer(max_file)
 
-median_writer.writerows(medians)
-max_writer.writerows(maxes)
+  median_writer.writerows(medians)
+  max_writer.writerows(maxes)
 
-elapsed_time = (time.time() - start_time) / 60
-print(elapsed_time)
\ No newline at end of file
+  elapsed_time = (time.time() - start_time) / 60
+  print(elapsed_time)
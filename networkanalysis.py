@@ -1,137 +1,268 @@
 import csv
+import numbers
 import os
-from random import shuffle
-
-
-
-class NetworkAnalysis(object):
-
-    def __init__(self, parentage_file, phenomes_file, progeny_count_file, num_traits=5, num_keywords=100, gen_len=100):
+import numpy
+import bitsets
+import citations
+import closure
+import csr
+import detail
+import dot
+import keywords
+import lazy
+import lineage
+import sketches
+
+
+
+try:
+    # paths are str, or on python 2 also unicode
+    string_types = basestring
+except NameError:
+    string_types = str
+
+# dot edges of citations whose child and parent share no keywords of
+# interest, and of those that do
+INHERITANCE_EDGES = ['/*bottom*/ %d -> %d [color="black", layer="bottom", style="solid"];\n',
+                     '/*top*/ %d -> %d [color="red", layer="top", style="bold"];\n']
+
+
+class NetworkAnalysis(lazy.Lazy):
+
+    def __init__(self, parentage_file, phenomes_file, progeny_count_file, num_traits=5, num_keywords=100, gen_len=100, bitsets=False, closure_budget=2**30):
+        # each input is either a csv or the in-memory object it would hold:
+        # a citations.CitationGraph, keywords.Phenomes (or any list of
+        # iterables of keywords) and an array of citation counts
         self.parentage_file = parentage_file
         self.progeny_count_file = progeny_count_file
         self.phenomes_file = phenomes_file
         self.num_traits = num_traits
         self.num_keywords = num_keywords
         self.gen_len = gen_len
+        # keep the phenomes as packed bitsets.Bitsets rather than frozensets,
+        # and intersect them over every citation at once
+        self.bitsets = bitsets
+        # bytes each of the ancestor and descendant closures may take
+        self.closure_budget = closure_budget
         self.setup()
 
     def setup(self):
+        # only the inputs are loaded here: what is derived from them is built
+        # on first use, and again if they are replaced (see lazy.derived)
         self.define_phenomes()
         self.define_parentage()
         self.define_progeny_count()
-        self.define_trait_count()
-        self.get_phylogenies()  
-    
-    def define_trait_count(self):
-        self.trait_count = [0 for i in range(self.num_keywords)]
 
-    def define_parentage(self):
-        self.parentage = []
-        with open(self.parentage_file) as f:
-            for row in csv.reader(f, delimiter=","):
-                self.parentage.append(row)
+    @lazy.derived('num_keywords')
+    def trait_count(self):
+        return [0 for i in range(self.num_keywords)]
 
-        # convert lists of strings to lists of ints
-        self.parentage = [map(int, parents) for parents in self.parentage]
+    def define_parentage(self):
+        # CSR graph: self.parentage[child] is an array of its parents
+        if isinstance(self.parentage_file, citations.CitationGraph):
+            self.parentage = self.parentage_file
+        else:
+            self.parentage = citations.CitationGraph.load(self.parentage_file)
 
         self.num_records = len(self.parentage)
 
     def define_progeny_count(self):
-        if self.progeny_count_file == None:
+        if self.progeny_count_file is None:
+            return
+
+        if not isinstance(self.progeny_count_file, string_types):
+            self.progeny_count = numpy.asarray(self.progeny_count_file, dtype=int)
             return
 
-        self.progeny_count = []
         with open(self.progeny_count_file) as f:
-            for row in csv.reader(f):
-                self.progeny_count.append(row)
+            self.progeny_count = numpy.array(next(csv.reader(f)), dtype=int)
         
     def define_phenomes(self):
-        self.phenomes = []
-        with open(self.phenomes_file) as f:
-            for row in csv.reader(f, delimiter=","):
-                self.phenomes.append(row)
-        
-        # convert lists of strings to frozensets of ints
-        self.phenomes = [frozenset(map(int, traits)) for traits in self.phenomes]
-    
+        # keywords.Phenomes: the distinct, sorted keywords of every record
+        if isinstance(self.phenomes_file, keywords.Phenomes):
+            self.keyword_rows = self.phenomes_file
+            return
+        if not isinstance(self.phenomes_file, string_types):
+            rows = self.phenomes_file
+        else:
+            with open(self.phenomes_file) as f:
+                # lists of strings to lists of ints
+                rows = [[int(trait) for trait in row] for row in csv.reader(f, delimiter=",")]
+
+        self.keyword_rows = keywords.Phenomes.from_lists([sorted(set(traits)) for traits in rows])
+
+    @lazy.derived('keyword_rows', 'bitsets')
+    def phenomes(self):
+        # the keywords of every record as frozensets, or packed into
+        # bitsets.Bitsets
+        if self.bitsets:
+            return bitsets.Bitsets.from_csr(self.keyword_rows, self.num_keywords)
+        return self.keyword_rows.frozensets()
+
 #==============================================================================
 # analysis
 #==============================================================================
     def first_degree_chains(self):
-        self.inheritance_count = [0 for i in range(len(self.parentage))]
-        self.inheritance_interactions = [[] for i in range(len(self.parentage))]
-        self.inheritance_interactions_colored = [[] for i in range(len(self.parentage))]
-        surviving_keywords = self.get_surviving_keywords(self.gen_len)
-        
-        for child, parents in enumerate(self.parentage):
-
-            for parent in parents:
-                intersection = self.phenomes[parent].intersection(self.phenomes[child])
-                # remove from intersection those keywords which do not persist to the final generation                
-                intersection = intersection.intersection(surviving_keywords)
-                if intersection:
-                    self.inheritance_count[parent] += len(intersection)
-                    for keyword in intersection:
-                        child_and_keyword = (child, keyword)
-                        self.update_trait_count(keyword)
-
-                    self.inheritance_interactions_colored[parent].append(child_and_keyword)
-                    self.inheritance_interactions[parent].append(child*len(intersection))
+        # every citation whose child and parent share keywords that persist
+        # to the final generation, as a CSR of children by parent
+        children, parents, edges, inherited = self.shared_keywords(self.surviving_keywords)
+        counts = numpy.bincount(edges, minlength=len(children))
+        hit = numpy.flatnonzero(counts)
+
+        trait_count = numpy.bincount(inherited, minlength=len(self.trait_count))
+        self.trait_count = (numpy.asarray(self.trait_count) + trait_count).tolist()
+        inheritance_count = numpy.bincount(parents[hit], weights=counts[hit],
+                                           minlength=len(self.parentage))
+        self.inheritance_count = inheritance_count.astype(int).tolist()
+
+        # shared keywords come by edge and then keyword, so each edge's last
+        # is its highest, which colors the interaction
+        highest = inherited[numpy.cumsum(counts[hit]) - 1]
+        order = numpy.argsort(parents[hit], kind='mergesort')
+        self.interactions = csr.CSR.from_rows(parents[hit], children[hit], len(self.parentage))
+        self.interaction_counts = counts[hit][order]
+        self.interaction_keywords = highest[order]
+
+    def shared_keywords(self, surviving_keywords):
+        """Child and parent of every citation, and the citation and keyword
+         of every one of surviving_keywords they share, by citation and then
+         keyword"""
+        children, parents = self.parentage.edges()
+        edges, inherited = self.shared(children, parents, surviving_keywords)
+        return children, parents, edges, inherited
+
+    def shared(self, a, b, keywords=None):
+        """Pair and keyword of every keyword the phenomes of a[e] and b[e]
+         share, for every pair e, by pair and then keyword. Only keywords
+         in keywords count, if given."""
+        a = numpy.asarray(a, dtype=numpy.int64)
+        b = numpy.asarray(b, dtype=numpy.int64)
+        if self.bitsets:
+            mask = None if keywords is None else self.phenomes.mask(keywords)
+            shared = self.phenomes.intersections(a, b, mask)
+            hit = numpy.flatnonzero(bitsets.popcount(shared))
+            rows, inherited = bitsets.set_bits(shared[hit])
+            return hit[rows], inherited
+
+        return self.keyword_rows.shared(a, b, keywords)
+
+    @lazy.derived('interactions', 'interaction_counts', 'interaction_keywords')
+    def interaction_lists(self):
+        # the interactions as lists by parent: child*count for every citation
+        # with count shared keywords, and (child, keyword)
+        children = self.interactions.indices.astype(numpy.int64)
+        products = (children * self.interaction_counts).tolist()
+        colored = list(zip(children.tolist(), self.interaction_keywords.tolist()))
+        bounds = list(zip(self.interactions.indptr[:-1].tolist(), self.interactions.indptr[1:].tolist()))
+        return [products[a:b] for a, b in bounds], [colored[a:b] for a, b in bounds]
+
+    @property
+    def inheritance_interactions(self):
+        return self.interaction_lists[0]
+
+    @property
+    def inheritance_interactions_colored(self):
+        return self.interaction_lists[1]
+
+    def carriers(self, keywords):
+        """Whether each patent's phenome has any of keywords, from the
+         inverted index"""
+        carriers = numpy.zeros(self.num_records, dtype=bool)
+        carriers[self.keyword_rows.carrying(keywords)] = True
+        return carriers
+
+    def carrier_citations(self, keywords):
+        """Child and parent of every citation whose child and parent both
+         have any of keywords, found from the patents with them"""
+        records = self.keyword_rows.carrying(keywords)
+        cited = self.parentage.take(records)
+        children, parents = records[cited.rows()], cited.indices.astype(numpy.int64)
+        if not len(records):
+            return children, parents
+        both = records[numpy.minimum(numpy.searchsorted(records, parents), len(records) - 1)] == parents
+        return children[both], parents[both]
+
+    def carried(self, children, parents, keywords):
+        """Whether the child and parent of each citation (children[e],
+         parents[e]) both have any of keywords, from carrier_citations"""
+        carried_children, carried_parents = self.carrier_citations(keywords)
+        width = self.num_records
+        return numpy.isin(numpy.asarray(children, dtype=numpy.int64) * width + parents,
+                          carried_children * width + carried_parents)
 
     def update_trait_count(self, keyword):
         self.trait_count[keyword] += 1
         
     def get_top_keywords(self, range):
-        # most cited patents
-        ordered_keywords_and_counts = sorted(enumerate(self.keyword_count), key=itemgetter(1))
-        reversed_ks_and_cs = ordered_keywords_and_counts[::-1]
-        most_cited_ks_and_cs = reversed_ks_and_cs[0:range]
-
-        return most_cited_ks_and_cs
+        # the keywords the most patents have, and how many, most first
+        return self.keyword_rows.top(range)
     
     def get_surviving_keywords(self, gen_len):
-        surviving_keywords = set()       
-        
-        for i in range(gen_len):        
-            phenome = self.phenomes[-i]
-            for keyword in phenome:
-                surviving_keywords.add(keyword)
-        return frozenset(surviving_keywords)
- 
-    def get_phylogenies(self):
-        parentage_sets = [frozenset(parents) for parents in self.parentage]
-        ancestors = [frozenset() for i in range(len(self.parentage))]
-
-        descendents = [frozenset() for i in range(len(self.parentage))]
-        
-        # ancestors
-        for child, parents in enumerate(parentage_sets):
-            ancestors[child] = parents
-            for parent in parents:
-                ancestors[child] = ancestors[child].union(ancestors[parent])
-
-        # descendents
-        direct_descendents = [[] for i in range(len(self.parentage))]
-        for child, parents in enumerate(parentage_sets):
-            for parent in parents:
-                direct_descendents[parent].append(child)
-
-        # This isn't working properly!
-        # list of frozensets        
-        direct_descendents = [frozenset(i) for i in direct_descendents]
-        descendents = direct_descendents
-
-        enum_dds = [(parent, children) for parent, children in enumerate(direct_descendents)]     
-        reversed_e_dds = enum_dds[::-1]
-        for parent, children in reversed_e_dds:
-            for child in children:
-                descendents[parent] = direct_descendents[parent].union(descendents[child])
+        # keywords of records -0 (the first), -1, ..., -(gen_len-1)
+        if not len(self.keyword_rows):
+            return frozenset()
+        records = -numpy.arange(gen_len) % len(self.keyword_rows)
+        return frozenset(numpy.unique(self.keyword_rows.take(records).indices).tolist())
+
+    @lazy.derived('keyword_rows', 'gen_len')
+    def surviving_keywords(self):
+        return self.get_surviving_keywords(self.gen_len)
+
+    @lazy.derived('parentage')
+    def children(self):
+        # reverse index: self.children[parent] is an array of its children
+        return self.parentage.children()
+
+    # self.ancestors[i] and self.descendents[i] are sorted arrays of the
+    # patents i descends from and that descend from i, each searched for on
+    # first use (see get_phylogenies for all of them at once)
+    @lazy.derived('parentage')
+    def ancestors(self):
+        return lineage.Relatives(self.parentage)
+
+    @lazy.derived('children')
+    def descendents(self):
+        return lineage.Relatives(self.children)
+
+    def ancestors_of(self, ids):
+        return self.ancestors.of(ids)
+
+    def descendants_of(self, ids):
+        return self.descendents.of(ids)
+
+    def ancestor_counts(self, ids):
+        return self.ancestors.counts(ids)
+
+    def descendant_counts(self, ids):
+        return self.descendents.counts(ids)
+
+    def estimated_descendant_counts(self, precision=10):
+        """Approximate number of descendents of every patent, from
+         HyperLogLog sketches (see sketches.ReachSketches), within about
+         1.04 / sqrt(2^precision) of the exact counts"""
+        return sketches.ReachSketches(self.children, self.parentage, precision).counts()
+
+    def descended_from(self, patents):
+        """Whether each patent descends from any of patents, as a boolean
+         array, from the graph's reachability index"""
+        patents = [int(patent) for patent in patents if isinstance(patent, numbers.Integral)]
+        return self.parentage.reachability().reached_from(patents, numpy.arange(self.num_records))
+
+    def genealogy(self, roots):
+        """The roots and their descendents as a boolean mask of patents, and
+         the citations among them as a citations.CitationGraph (see
+         CitationGraph.induced), found from the reverse index"""
+        roots = [int(root) for root in roots if isinstance(root, numbers.Integral)]
+        nodes = numpy.zeros(self.num_records, dtype=bool)
+        nodes[roots] = True
+        nodes[lineage.reachable(self.children, roots)] = True
+        return nodes, self.parentage.induced(nodes)
 
-        # list of lists        
-        descendents = [list(i) for i in descendents]
-
-        self.ancestors = ancestors   
-        self.descendents = descendents
+    def get_phylogenies(self):
+        # every patent's ancestors and descendents at once, in place of
+        # searching for them one at a time
+        self.ancestors = closure.Closure(self.parentage, self.children, self.closure_budget)
+        self.descendents = closure.Closure(self.children, self.parentage, self.closure_budget)
 
 #==============================================================================
 #  metrics
@@ -149,22 +280,43 @@ class NetworkAnalysis(object):
         print ("expected: %d%%" % expected)
         print ("actual: %d%%" % actual)
 
+    def keyword_frequencies(self):
+        """Number of records with each keyword"""
+        return numpy.bincount(self.keyword_rows.indices, minlength=self.num_keywords)
+
     def inheritance_average_random(self):
-        for record in range(self.num_records):           
-            for comparison in range(self.num_records):
-                if record != comparison:                
-                    intersection = self.phenomes[record].intersection(self.phenomes[comparison])              
-    
-                    try:
-                      average
-                    except NameError:
-                        average = float(len(intersection))
-                    else:
-                        average = float(len(intersection) + average) / 2
-           
-        return average
-                    
+        """Mean number of keywords shared by two different records, over
+         every pair: a pair shares keyword k if both are among the c_k
+         records with it, so the mean is sum(C(c_k, 2)) / C(n, 2)"""
+        if self.num_records < 2:
+            return None
+        counts = self.keyword_frequencies().astype(float)
+        pairs = self.num_records * (self.num_records - 1) / 2.0
+        return (counts * (counts - 1) / 2).sum() / pairs
+
+    def sampled_inheritance_average_random(self, num_pairs=10000, z=1.96):
+        """inheritance_average_random estimated from num_pairs random pairs
+         of different records. Returns the estimate and the bounds of its
+         confidence interval, z standard errors either side (1.96: 95%),
+         or nan for all three if there are no two records to pair."""
+        if self.num_records < 2:
+            nan = float('nan')
+            return nan, nan, nan
+        a = numpy.random.randint(0, self.num_records, num_pairs)
+        # a different record, uniformly
+        b = (a + numpy.random.randint(1, self.num_records, num_pairs)) % self.num_records
+        pairs = self.shared(a, b)[0]
+        overlaps = numpy.bincount(pairs, minlength=num_pairs)
+
+        mean = overlaps.mean()
+        error = z * overlaps.std(ddof=1) / numpy.sqrt(num_pairs) if num_pairs > 1 else float('inf')
+        return mean, mean - error, mean + error
+
     def inheritance_average_related(self):
+        if self.bitsets:
+            children, parents = self.parentage.edges()
+            return running_average(bitsets.popcount(self.phenomes.intersections(children, parents)))
+
         for child, parents in enumerate(self.parentage):       
             for parent in parents:
                 intersection = self.phenomes[child].intersection(self.phenomes[parent])
@@ -194,86 +346,67 @@ class NetworkAnalysis(object):
 #==============================================================================
 
     def colors_for_graphviz(self, palette="rainbow"):
-        # For multi-colored inheritance layers. Greys, black and white removed.
-        # Shuffle into random order
-        rainbow = ["red", "yellow", "orange", "green", "blue", "purple"]
-        svg = ["aliceblue", "antiquewhite", "aqua", "aquamarine", "beige", "blue", "blueviolet", "brown", "burlywood", "cadetblue", "chartreuse", "chocolate", "coral", "cornflowerblue", "cornsilk", "crimson", "cyan", "darkblue", "darkcyan", "darkgoldenrod", "darkgray", "darkgreen", "darkgrey", "darkkhaki", "darkmagenta", "darkolivegreen", "darkorange", "darkorchid", "darkred", "darksalmon", "darkseagreen", "darkslateblue", "darkslategray", "darkturquoise", "darkviolet", "deeppink", "deepskyblue", "dimgray", "dodgerblue", "firebrick", "forestgreen", "fuchsia", "gainsboro", "gold", "goldenrod", "gray", "green", "greenyellow", "hotpink", "indianred", "indigo", "khaki", "lavender", "lavenderblush", "lawngreen", "lemonchiffon", "lightblue", "lightcoral", "lightcyan", "lightgoldenrodyellow", "lightgray", "lightgreen", "lightgrey", "lightpink", "lightsalmon", "lightseagreen", "lightskyblue", "lightslategray", "lightsteelblue", "lightyellow", "lime", "limegreen", "linen", "magenta", "maroon", "mediumaquamarine", "mediumblue", "mediumorchid", "mediumpurple", "mediumseagreen", "mediumslateblue", "mediumspringgreen", "mediumturquoise", "mediumvioletred", "midnightblue", "mistyrose", "moccasin", "navajowhite", "navy", "oldlace", "olive", "olivedrab", "orange", "orangered", "orchid", "palegoldenrod", "palegreen", "paleturquoise", "palevioletred", "papayawhip", "peachpuff", "peru", "pink", "plum", "powderblue", "purple", "red", "rosybrown", "royalblue", "saddlebrown", "salmon", "sandybrown", "seagreen", "seashell", "sienna", "silver", "skyblue", "slateblue", "slategray", "slategrey", "springgreen", "steelblue", "tan", "teal", "thistle", "tomato", "turquoise", "violet", "wheat", "whitesmoke", "yellow", "yellowgreen"]
-        x11 = ["aliceblue", "antiquewhite", "antiquewhite1", "antiquewhite2", "antiquewhite3", "antiquewhite4", "aquamarine", "aquamarine1", "aquamarine2", "aquamarine3", "aquamarine4", "azure", "azure1", "azure2", "azure3", "azure4", "beige", "bisque", "bisque1", "bisque2", "bisque3", "bisque4", "blanchedalmond", "blue", "blue1", "blue2", "blue3", "blue4", "blueviolet", "brown", "brown1", "brown2", "brown3", "brown4", "burlywood", "burlywood1", "burlywood2", "burlywood3", "burlywood4", "cadetblue", "cadetblue1", "cadetblue2", "cadetblue3", "cadetblue4", "chartreuse", "chartreuse1", "chartreuse2", "chartreuse3", "chartreuse4", "chocolate", "chocolate1", "chocolate2", "chocolate3", "chocolate4", "coral", "coral1", "coral2", "coral3", "coral4", "cornflowerblue", "cornsilk", "cornsilk1", "cornsilk2", "cornsilk3", "cornsilk4", "crimson", "cyan", "cyan1", "cyan2", "cyan3", "cyan4", "darkgoldenrod", "darkgoldenrod1", "darkgoldenrod2", "darkgoldenrod3", "darkgoldenrod4", "darkgreen", "darkkhaki", "darkolivegreen", "darkolivegreen1", "darkolivegreen2", "darkolivegreen3", "darkolivegreen4", "darkorange", "darkorange1", "darkorange2", "darkorange3", "darkorange4", "darkorchid", "darkorchid1", "darkorchid2", "darkorchid3", "darkorchid4", "darksalmon", "darkseagreen", "darkseagreen1", "darkseagreen2", "darkseagreen3", "darkseagreen4", "darkslateblue", "darkslategray", "darkslategray1", "darkslategray2", "darkslategray3", "darkslategray4", "darkslategrey", "darkturquoise", "darkviolet", "deeppink", "deeppink1", "deeppink2", "deeppink3", "deeppink4", "deepskyblue", "deepskyblue1", "deepskyblue2", "deepskyblue3", "deepskyblue4", "dimgray", "dimgrey", "dodgerblue", "dodgerblue1", "dodgerblue2", "dodgerblue3", "dodgerblue4", "firebrick", "firebrick1", "firebrick2", "firebrick3", "firebrick4", "floralwhite", "forestgreen", "gainsboro", "ghostwhite", "gold", "gold1", "gold2", "gold3", "gold4", "goldenrod", "goldenrod1", "goldenrod2", "goldenrod3", "goldenrod4", "honeydew", "honeydew1", "honeydew2", "honeydew3", "honeydew4", "hotpink", "hotpink1", "hotpink2", "hotpink3", "hotpink4", "indianred", "indianred1", "indianred2", "indianred3", "indianred4", "indigo", "invis", "ivory", "ivory1", "ivory2", "ivory3", "ivory4", "khaki", "khaki1", "khaki2", "khaki3", "khaki4", "lavender", "lavenderblush", "lavenderblush1", "lavenderblush2", "lavenderblush3", "lavenderblush4", "lawngreen", "lemonchiffon", "lemonchiffon1", "lemonchiffon2", "lemonchiffon3", "lemonchiffon4", "lightblue", "lightblue1", "lightblue2", "lightblue3", "lightblue4", "lightcoral", "lightcyan", "lightcyan1", "lightcyan2", "lightcyan3", "lightcyan4", "lightgoldenrod", "lightgoldenrod1", "lightgoldenrod2", "lightgoldenrod3", "lightgoldenrod4", "lightgoldenrodyellow", "lightgray", "lightgrey", "lightpink", "lightpink1", "lightpink2", "lightpink3", "lightpink4", "lightsalmon", "lightsalmon1", "lightsalmon2", "lightsalmon3", "lightsalmon4", "lightseagreen", "lightskyblue", "lightskyblue1", "lightskyblue2", "lightskyblue3", "lightskyblue4", "lightslateblue", "lightslategray", "lightslategrey", "lightsteelblue", "lightsteelblue1", "lightsteelblue2", "lightsteelblue3", "lightsteelblue4", "lightyellow", "lightyellow1", "lightyellow2", "lightyellow3", "lightyellow4", "limegreen", "linen", "magenta", "magenta1", "magenta2", "magenta3", "magenta4", "maroon", "maroon1", "maroon2", "maroon3", "maroon4", "mediumaquamarine", "mediumblue", "mediumorchid", "mediumorchid1", "mediumorchid2", "mediumorchid3", "mediumorchid4", "mediumpurple", "mediumpurple1", "mediumpurple2", "mediumpurple3", "mediumpurple4", "mediumseagreen", "mediumslateblue", "mediumspringgreen", "mediumturquoise", "mediumvioletred", "midnightblue", "mintcream", "mistyrose", "mistyrose1", "mistyrose2", "mistyrose3", "mistyrose4", "moccasin", "navajowhite", "navajowhite1", "navajowhite2", "navajowhite3", "navajowhite4", "navy", "navyblue", "none", "oldlace", "olivedrab", "olivedrab1", "olivedrab2", "olivedrab3", "olivedrab4", "orange", "orange1", "orange2", "orange3", "orange4", "orangered", "orangered1", "orangered2", "orangered3", "orangered4", "orchid", "orchid1", "orchid2", "orchid3", "orchid4", "palegoldenrod", "palegreen", "palegreen1", "palegreen2", "palegreen3", "palegreen4", "paleturquoise", "paleturquoise1", "paleturquoise2", "paleturquoise3", "paleturquoise4", "palevioletred", "palevioletred1", "palevioletred2", "palevioletred3", "palevioletred4", "papayawhip", "peachpuff", "peachpuff1", "peachpuff2", "peachpuff3", "peachpuff4", "peru", "pink", "pink1", "pink2", "pink3", "pink4", "plum", "plum1", "plum2", "plum3", "plum4", "powderblue", "purple", "purple1", "purple2", "purple3", "purple4", "red", "red1", "red2", "red3", "red4", "rosybrown", "rosybrown1", "rosybrown2", "rosybrown3", "rosybrown4", "royalblue", "royalblue1", "royalblue2", "royalblue3", "royalblue4", "saddlebrown", "salmon", "salmon1", "salmon2", "salmon3", "salmon4", "sandybrown", "seagreen", "seagreen1", "seagreen2", "seagreen3", "seagreen4", "seashell", "seashell1", "seashell2", "seashell3", "seashell4", "sienna", "sienna1", "sienna2", "sienna3", "sienna4", "skyblue", "skyblue1", "skyblue2", "skyblue3", "skyblue4", "slateblue", "slateblue1", "slateblue2", "slateblue3", "slateblue4", "slategray", "slategray1", "slategray2", "slategray3", "slategray4", "slategrey", "snow", "snow1", "snow2", "snow3", "snow4", "springgreen", "springgreen1", "springgreen2", "springgreen3", "springgreen4", "steelblue", "steelblue1", "steelblue2", "steelblue3", "steelblue4", "tan", "tan1", "tan2", "tan3", "tan4", "thistle", "thistle1", "thistle2", "thistle3", "thistle4", "tomato", "tomato1", "tomato2", "tomato3", "tomato4", "transparent", "turquoise", "turquoise1", "turquoise2", "turquoise3", "turquoise4", "violet", "violetred", "violetred1", "violetred2", "violetred3", "violetred4", "wheat", "wheat1", "wheat2", "wheat3", "wheat", "whitesmoke", "yellow", "yellow1", "yellow2", "yellow3", "yellow4", "yellowgreen"]
-
-
+        # colors of a palette in random order (see dot.colors), randomized
+        # independently of the keyword colors, which are fixed on first use
         if not hasattr(self, 'keyword_colors'):
-            shuffle(x11)
-            self.keyword_colors = x11
-
-        # if need colors randomized independently of keyword colors
-        if palette == "x11":
-            colors = x11
-        elif palette == "svg":
-            colors = svg
-        else:
-            colors = rainbow
+            self.keyword_colors = dot.colors("x11")
+        return dot.colors(palette)
 
-        shuffle(colors)
-        return colors
-
-    def grid(self, starting_node, ending_node, nodes_per_gen, xmax, ymax, starting_y, num_rows, file):
-        xmax = float(xmax)
-        ymax = float(ymax)
-
-        y = starting_y
-        num_nodes = ending_node - starting_node
+    def dot_path(self, output_file, compress=False):
+        # where the dot files go, gzipped if compress
+        full_path = os.path.realpath(__file__)
+        start_path = os.path.dirname(full_path)
+        if compress:
+            output_file += '.gz'
+        return os.path.join(start_path, 'network', 'to_file', output_file)
+
+    def grid(self, starting_node, ending_node, nodes_per_gen, xmax, ymax, starting_y, num_rows, writer, nodes=None):
+        # positions of the patents from starting_node to ending_node in rows
+        # of nodes_per_gen, see detail.grid_positions. Given nodes, a boolean
+        # mask, only those are placed, on rows for only the generations that
+        # hold any (see detail.compact_rows), num_rows of them if given
+        ids = numpy.arange(starting_node, ending_node)
+        rows = None
+        if nodes is not None:
+            ids = ids[nodes[starting_node:ending_node]]
+            rows, num_gens = detail.compact_rows(ids, nodes_per_gen)
+            num_rows = num_rows or max(num_gens, 2)
         if not num_rows:
-            num_rows = (num_nodes/nodes_per_gen)
+            num_rows = (ending_node - starting_node)/nodes_per_gen
+        x, y = detail.grid_positions(ids, starting_node, nodes_per_gen, xmax, ymax, starting_y, num_rows, rows)
+        writer.positions(ids, x, y)
 
-        # number of inches / (number of rows - 1)
-        yincr = ymax / (num_rows - 1)
-
-        x = 0
-        for n in range(starting_node, ending_node):
-            # max inches across
-            xincr = xmax/ (nodes_per_gen - 1)
-            file.write('%d [pos="%f, %f!"];\n' % (n, x, y))
-            x += xincr
-
-            # new row: reset x and increment y
-            if (n + 1) % nodes_per_gen == 0:
-               x = 0
-               y -= yincr
-
-    def pyramid(self, limits, xmax, ymax, num_rows, file):
+    def pyramid(self, limits, xmax, ymax, num_rows, writer):
         # num_rows should include both pyramid AND rectangular grid in order
-        # that each "generation" be equal
-
-        xmax = float(xmax)
-        ymax = float(ymax)
-
-        y = ymax
-        yprime = 0
-        # number of inches / (number of rows - 1)
-        yincr = ymax/(num_rows - 1)
-
-        file.write('0 [pos="%f, %f!"];\n' % (xmax/2, y))
-
-        for a_range in limits:
-            range_min = a_range[0]
-            range_max = a_range[1]
-
-            yprime += yincr
-            y -= yincr
-            # outermost nodes are on the lines from the origin to the outermost
-            # nodes of the first generation of the rectangular grid (a'b/a = b')
-            row_width = (yprime*xmax)/(yincr*(len(limits)+1))
-            x = xmax/2 - row_width/2
-            for n in range(range_min, range_max):
-                xincr = row_width / (range_max - range_min - 1)
-                file.write('%d [pos="%f, %f!"];\n' % (n, x, y))
-                x += xincr
-
-        # starting position for grid
-        y -= yincr
-        return y
-
-    def dot_for_graphviz(self, selected_layer, focus):
+        # that each "generation" be equal. Returns the starting y for the grid.
+        ids, x, y, starting_y = detail.pyramid_positions(limits, xmax, ymax, num_rows)
+        writer.positions(ids, x, y)
+        return starting_y
+
+    def inheriting(self):
+        """Whether the child and parent of each citation of
+         parentage.edges() share keywords that persist to the final
+         generation"""
+        children, parents, edges, inherited = self.shared_keywords(self.surviving_keywords)
+        return numpy.bincount(edges, minlength=len(children)) > 0
+
+    def level_of_detail(self, budget, stratify=False, precision=6):
+        """At most budget patents to draw in place of the whole network, as
+         a boolean mask, and the citations among them as a
+         citations.CitationGraph. Chains of patents inheriting nothing are
+         cut out first (see detail.collapse_chains), then those with the
+         most descendants kept, by counts sketched at precision (rough
+         counts rank them well enough), or if stratify the most in each
+         generation (see detail.stratified)."""
+        kept, graph = detail.collapse_chains(self.parentage, self.inheriting())
+        counts = self.estimated_descendant_counts(precision)
+        if stratify:
+            nodes = detail.stratified(self.num_records, self.gen_len, budget, kept, counts)
+        else:
+            nodes = detail.top_descendants(counts, budget, kept)
+        return nodes, graph.induced(nodes)
+
+    def dot_for_graphviz(self, selected_layer, focus, compress=False, budget=None, stratify=False):
         # In command line: dot -Kfdp -n -Textension -o out_name.extension in_name.dot
         # e.g., dot -Kfdp -n -Tps -o sample.ps  dot_for_graphviz.dot (prints paths which can be opened in Illustrator)
 
@@ -282,56 +415,40 @@ class NetworkAnalysis(object):
         both_prefix = "both_"
 
         phylo_colors = self.colors_for_graphviz("rainbow")
+        descended = self.descended_from([selected_layer])
+
+        # every citation is drawn with templates[kinds[citation]], of at
+        # most budget patents if given (see level_of_detail)
+        nodes, graph = None, self.parentage
+        if budget is not None and budget < self.num_records:
+            nodes, graph = self.level_of_detail(budget, stratify)
+        children, parents = graph.edges()
+        templates = ['/*bottom*/ %d -> %d [color=black, layer="bottom", style="solid"];\n']
+        kinds = numpy.zeros(len(children), dtype=numpy.int64)
+        top = '/*top*/ %%d -> %%d [color=%s, layer="top", style="%s"];\n'
 
-        edges = []
-        for child, parents in enumerate(self.parentage):
-            if parents:
-                for parent in parents:
-                    row = "/*bottom*/ %d -> %d [color=black, layer=\"bottom\", style=\"solid\"];\n" % (parent, child)
-
-                    if 'phylo' in focus:
-                       if (selected_layer in self.ancestors[parent]) or (parent == selected_layer):
-                            # write rows
-                            row = ("/*top*/ %d -> %d [color=%s, layer=\"top\", style=\"bold\"];\n"
-                                   % (parent, child, phylo_colors[0]))
-
-                    elif selected_layer == "all":
-                        pass
-
-                    else:
-                        if child in self.inheritance_interactions[parent] and (selected_layer == "top" or type(selected_layer) is int):
-                             for citation, keyword in self.inheritance_interactions_colored[parent]:
-                                    if child == citation:
-
-                                        if self.inheritance_interactions[parent].count(child) <= 1:
-                                            style = "solid"
-                                        else:
-                                            style = "bold"
-
-
-                                        if focus == "both":
-                                            # phylo edges
-                                            if selected_layer in self.ancestors[child]:
-                                                    # write rows
-                                                    row = ("/*top*/ %d -> %d [color=%s, layer=\"top\", style=\"%s\"];\n"
-                                                           % (parent, child, phylo_colors[0], style))
-                                        else:
-                                            if type(selected_layer) == int:
-                                                if keyword == selected_layer:
-                                                    row = ("/*top*/ %d -> %d [color=%s, layer=\"top\", style=\"%s\"];\n"
-                                                           % (parent, child, self.keyword_colors[keyword % len(self.keyword_colors)], style))
-                                            elif selected_layer == "top":
-                                               # row = ("/*top*/ %d -> %d [color=%s, layer=\"top\", style=\"%s\"];\n"
-                                                 #          % (parent, child, self.keyword_colors[keyword % len(self.keyword_colors)], style))
-                                                 row = ("/*top*/ %d -> %d [color=\"red\", layer=\"top\", style=\"%s\"];\n"
-                                                        % (parent, child, style))
-                    edges.append(row)
-
-        edges.sort()
-
-        # get the path
-        full_path = os.path.realpath(__file__)
-        start_path = os.path.dirname(full_path)
+        if 'phylo' in focus:
+            templates.append(top % (phylo_colors[0], "bold"))
+            focused = descended[parents]
+            if isinstance(selected_layer, numbers.Integral):
+                focused |= parents == selected_layer
+            kinds[focused] = 1
+
+        elif selected_layer == "all":
+            pass
+
+        elif selected_layer == "top" or type(selected_layer) is int:
+            drawn, bold, keyword = self.drawn_interactions(children, parents)
+            if focus == "both":
+                color = phylo_colors[0]
+                drawn &= descended[children]
+            elif type(selected_layer) is int:
+                color = self.keyword_colors[selected_layer % len(self.keyword_colors)]
+                drawn &= keyword == selected_layer
+            else:
+                color = '"red"'
+            templates += [top % (color, "solid"), top % (color, "bold")]
+            kinds[drawn] = 1 + bold[drawn]
 
         if 'phylo' in focus:
             output_file = phylo_prefix + str(selected_layer) + ".dot"
@@ -340,16 +457,11 @@ class NetworkAnalysis(object):
         elif 'both' in focus:
             output_file = both_prefix + str(selected_layer) + ".dot"
 
-        final_path = os.path.join(start_path, 'network', 'to_file', output_file)
-        file = open(final_path, 'w')
-
         if not selected_layer in ("all", "bottom"):
             selected_layer = "top"
 
         # general attributes
-        file.write(
-"""digraph inheritance {
-center=true;
+        header = """center=true;
 node [shape=point]
 node [layer=all];
 splines=line;
@@ -359,68 +471,75 @@ layerselect="%s";
 overlap="true";
 
 """ % selected_layer
-)
-        # nodes (house plot)
+        with dot.DotWriter(self.dot_path(output_file, compress), header, compress) as writer:
+            # nodes (house plot)
 #==============================================================================
-#         xmax = float(30)
-#         ymax = float(30)
-#         num_rows = 15
+#             xmax = float(30)
+#             ymax = float(30)
+#             num_rows = 15
 # 
-#         limits = [(1, 3), (3, 13), (13, 33), (33, 63), (63, 100)]
-#         starting_y = self.pyramid(limits, xmax, ymax, num_rows, file)
-#         self.grid(100, 1000, 20, xmax, 5, starting_y, num_rows, file)
+#             limits = [(1, 3), (3, 13), (13, 33), (33, 63), (63, 100)]
+#             starting_y = self.pyramid(limits, xmax, ymax, num_rows, writer)
+#             self.grid(100, 1000, 20, xmax, 5, starting_y, num_rows, writer)
 #==============================================================================
 
-        xmax = float(30)
-        ymax = float(30)
-        self.grid(0, 1000, self.gen_len, xmax, ymax, ymax, 100, file)
-
-        # edges
-        for row in edges:
-            file.write(row)
-        file.write('}\n')
-        file.close()
-
-    def genealogy_dot(self, focus, interest, selected_layer):
+            # a reduced network gets a row for each generation it keeps
+            xmax = float(30)
+            ymax = float(30)
+            num_rows = max(100, -(-self.num_records//self.gen_len)) if nodes is None else None
+            self.grid(0, self.num_records, self.gen_len, xmax, ymax, ymax, num_rows, writer, nodes)
+
+            writer.edges(parents, children, templates, kinds)
+
+    def drawn_interactions(self, children, parents):
+        """Of every citation, whether the interactions draw it, whether
+         bold, and its keyword: a citation is drawn if its child is among
+         its parent's inheritance_interactions (children times their counts
+         of shared keywords) and has an interaction with it, and bold if
+         there more than once"""
+        drawn = numpy.zeros(len(children), dtype=bool)
+        if not len(self.interactions.indices):
+            return drawn, drawn, numpy.zeros(len(children), dtype=numpy.int64)
+        owners = numpy.repeat(numpy.arange(len(self.interactions), dtype=numpy.int64),
+                              self.interactions.lengths())
+        interacting = self.interactions.indices.astype(numpy.int64)
+
+        # the interaction of every citation, from the sorted (parent, child)
+        # of every interaction
+        width = self.num_records
+        keys = owners * width + interacting
+        order = numpy.argsort(keys, kind='mergesort')
+        sought = parents * width + children
+        entry = order[numpy.minimum(numpy.searchsorted(keys[order], sought), len(keys) - 1)]
+        has = keys[entry] == sought
+
+        # times the child is among the sorted (parent, child*count)
+        products = interacting * self.interaction_counts
+        span = max(int(products.max()) + 1, width)
+        product_keys = numpy.sort(owners * span + products)
+        sought = parents * span + children
+        times = (numpy.searchsorted(product_keys, sought, side='right') -
+                 numpy.searchsorted(product_keys, sought))
+
+        return has & (times > 0), times > 1, self.interaction_keywords[entry]
+
+    def genealogy_dot(self, focus, interest, selected_layer, compress=False):
         # In command line: dot -Kfdp -n -Textension -o out_name.extension in_name.dot
         # e.g., dot -Kfdp -n -Tps -o sample.ps  dot_for_graphviz.dot (prints paths which can be opened in Illustrator)
         
-        descendents = []
-        for i in interest:
-            descendents += self.descendents[i]
+        nodes, genealogy = self.genealogy(interest)
     
         phylo_colors = self.colors_for_graphviz("rainbow")
-        
-        edges = []
-        for child, parents in enumerate(self.parentage):
-            if parents:
-                for parent in parents:
-                    if parent in descendents or parent in interest:
-                        row = '/*bottom*/ %d -> %d [color="black", layer="bottom", style="solid"];\n' % (parent, child)
-                        # both parent and child possess the selected phenotype
-                        if selected_layer.intersection(self.phenomes[child]) and selected_layer.intersection(self.phenomes[parent]):
-                            row = ('/*top*/ %d -> %d [color="red", layer="top", style="bold"];\n'
-                                           % (parent, child))
-                        #elif frozenset(self.phenomes[child]).intersection(frozenset(self.phenomes[parent])):
-                        #    row = ('/*top*/ %d -> %d [color="red", layer="top", style="bold"];\n'
-                        #                  % (parent, child))
-                        edges.append(row)
-    
-        edges.sort()
-    
-        # get the path
-        full_path = os.path.realpath(__file__)
-        start_path = os.path.dirname(full_path)
+        carriers = self.carriers(selected_layer)
+
+        # both parent and child possess the selected phenotype
+        children, parents = genealogy.edges()
+        both = self.carried(children, parents, selected_layer)
 
         output_file = 'top_' + str(len(interest)) + '.dot'
-        final_path = os.path.join(start_path, 'network', 'to_file', output_file)
-        file = open(final_path, 'w')
-    
     
         # general attributes
-        file.write(
-"""digraph inheritance {
-center=true;
+        header = """center=true;
 ratio = .77
 size = 5
 node [shape=square, style = filled, fixedsize=false, height = .3, width=.3, fillcolor = black, label = ""]
@@ -428,70 +547,17 @@ node [layer=all];
 edge [arrowhead=none];
 
 """
-)
-        # guide rank
-        file.write('/*guide*/ { node [color=invis, fillcolor = invis]; edge [style=invis]; ')
-        for i in range(self.num_records//self.gen_len - 1):
-            s = ('gen_',str(i),' -> ')
-            s = ''.join(s)      
-            file.write(s)
-        s = ('gen_',str(self.num_records//self.gen_len-1))
-        s = ''.join(s) 
-        file.write(s)
-        file.write(';}\n')
-    
-    
-        # inheritance interactions of interest
-        # not using this right now, don't know why I was
-        #                        
-        ii_set = [set(i) for i in self.inheritance_interactions]
-        iis = set()
-        for i in range(self.num_records):
-            if len(ii_set[i]) != 0:
-                iis.add(i)
-                iis = iis.union(ii_set[i])
-        iiis = frozenset(iis)
-        iiis = iiis.intersection(descendents)
-
-        #
-        # patent ranks
-        #
-        # generation
-        for i in range(self.num_records//self.gen_len):
-            s = ('{ rank = same; gen_',str(i),'; ')            
-            s = ''.join(s)
-            file.write(s)
-            # patent nodes            
-            for j in range(self.gen_len):
-                # genealogy                
-                 rec = i*self.gen_len + j
-                 if frozenset(interest).intersection(frozenset(self.ancestors[rec])) or rec in interest:             
-                    s = (str(rec),'; ')
-                    s = ''.join(s)           
-                    file.write(s)
-                        
-            # close subgraph
-            file.write('}\n')
-
-        # color patent nodes (red for trait of interest)
-        for patent, phenome in enumerate(self.phenomes):
-
-            relatives_of_interest = frozenset(interest).intersection(frozenset(self.ancestors[patent]))
-            relatives_of_interest = list(relatives_of_interest)
-            if relatives_of_interest or patent in interest: 
-                # does this patent have the phenotype of interest?
-                if selected_layer.intersection(phenome):
-                    string = str(patent) + ' [color = red, fillcolor = red]\n'
-                    file.write(string)
-        
-        #
-        # edges
-        for row in edges:
-            file.write(row)
-        file.write('}\n')
-        file.close()
-
-    def all_dot(self, selected_layer, focus, count):
+        num_gens = self.num_records//self.gen_len
+        with dot.DotWriter(self.dot_path(output_file, compress), header, compress) as writer:
+            writer.guide(num_gens)
+            # patent nodes of the genealogy, ranked by generation
+            writer.ranks([first + numpy.flatnonzero(nodes[first:first + self.gen_len])
+                          for first in range(0, num_gens*self.gen_len, self.gen_len)])
+            # color patent nodes (red for trait of interest)
+            writer.nodes(numpy.flatnonzero(nodes & carriers), '[color = red, fillcolor = red]')
+            writer.edges(parents, children, INHERITANCE_EDGES, both)
+
+    def all_dot(self, selected_layer, focus, count, compress=False, budget=None, stratify=False):
         # In command line: dot -Kfdp -n -Textension -o out_name.extension in_name.dot
         # e.g., dot -n -Tps -o sample.ps dot_for_graphviz.dot (prints paths which can be opened in Illustrator)
     
@@ -500,36 +566,23 @@ edge [arrowhead=none];
         phylo_prefix = "phylo_"
         keyword_prefix = "keyword_"
         both_prefix = "both_"    
-        edges = []
-
-        for child, parents in enumerate(self.parentage):
-            if parents:
-                for parent in parents:
-                    row = '/*bottom*/ %d -> %d [color="black", layer="bottom", style="solid"];\n' % (parent, child)
-                    if selected_layer in self.phenomes[child] and selected_layer in self.phenomes[parent]:
-                        row = ('/*top*/ %d -> %d [color="red", layer="top", style="bold"];\n'
-                                       % (parent, child))
-                    edges.append(row)
-    
-        edges.sort()
-    
-        # get the path
-        full_path = os.path.realpath(__file__)
-        start_path = os.path.dirname(full_path)
+        carriers = self.carriers([selected_layer])
+
+        # of at most budget patents if given (see level_of_detail)
+        nodes, graph = numpy.ones(self.num_records, dtype=bool), self.parentage
+        if budget is not None and budget < self.num_records:
+            nodes, graph = self.level_of_detail(budget, stratify)
+        children, parents = graph.edges()
+        both = self.carried(children, parents, [selected_layer])
     
         output_file = 'top_' + str(count) + '.dot'
-
-        final_path = os.path.join(start_path, 'network', 'to_file', output_file)
-        file = open(final_path, 'w')
     
         layer_select = selected_layer    
         if not selected_layer in ("all", "bottom"):
             layer_select = "top"
         
         # general attributes
-        file.write(
-"""digraph inheritance {
-center=true;
+        header = """center=true;
 ratio = .77
 size = 5
 node [shape=square, style = filled, fixedsize=false, height = 1, width= 1, fillcolor = black, label = ""]
@@ -539,46 +592,27 @@ edge [arrowhead=none];
 /*layerselect="%s";*/
 
 """ % layer_select
-)
-        # guide rank
-        file.write('/*guide*/ { node [color=invis, fillcolor = invis]; edge [style=invis]; ')
-        for i in range(self.num_records//self.gen_len - 1):
-            s = ('gen_',str(i),' -> ')
-            s = ''.join(s)      
-            file.write(s)
-        s = ('gen_',str(self.num_records//self.gen_len-1))
-        s = ''.join(s) 
-        file.write(s)
-        file.write(';}\n')
-
-        #
-        # patent ranks
-        #
-        # generation
-        for i in range(self.num_records//self.gen_len):
-            s = ('{ rank = same; gen_',str(i),'; ')            
-            s = ''.join(s)
-            file.write(s)
-            # patent nodes            
-            for j in range(self.gen_len):
-                # genealogy                
-                rec = i*self.gen_len + j            
-                s = (str(rec),'; ')
-                s = ''.join(s)           
-                file.write(s)
-                        
-            # close subgraph
-            file.write('}\n')
-
-        # color patent nodes (red for trait of interest)
-        for patent, phenome in enumerate(self.phenomes):
-            if selected_layer in phenome:
-                string = str(patent) + ' [color = red, fillcolor = red]\n'
-                file.write(string)
-        
-        #
-        # edges
-        for row in edges:
-            file.write(row)
-        file.write('}\n')
-        file.close()
\ No newline at end of file
+        num_gens = self.num_records//self.gen_len
+        # patent nodes, ranked by generation, only those holding any
+        groups = [first + numpy.flatnonzero(nodes[first:first + self.gen_len])
+                  for first in range(0, num_gens*self.gen_len, self.gen_len)]
+        groups = [group for group in groups if len(group)]
+        with dot.DotWriter(self.dot_path(output_file, compress), header, compress) as writer:
+            writer.guide(len(groups))
+            writer.ranks(groups)
+            # color patent nodes (red for trait of interest)
+            writer.nodes(numpy.flatnonzero(nodes & carriers), '[color = red, fillcolor = red]')
+            writer.edges(parents, children, INHERITANCE_EDGES, both)
+
+
+def running_average(values, average=None):
+    """The running average of the inheritance averages: each value is
+     averaged with the average of those before it (the first taken as is),
+     continuing from average"""
+    values = numpy.asarray(values, dtype=float)
+    if average is None:
+        if not len(values):
+            return None
+        average, values = values[0], values[1:]
+    weights = 0.5 ** numpy.arange(len(values), 0, -1)
+    return average * 0.5 ** len(values) + (values * weights).sum()
@@ -0,0 +1,156 @@
+import numpy
+import bitsets
+
+
+
+def gini(histogram):
+    """Gini coefficient of values given as a histogram: histogram[v] of them
+     are v"""
+    histogram = numpy.asarray(histogram, dtype=float)
+    values = numpy.arange(len(histogram))
+    n = histogram.sum()
+    total = (values * histogram).sum()
+    if not total:
+        return 0.0
+    # in sorted order the values v take ranks below+1 to below+histogram[v]
+    below = numpy.cumsum(histogram) - histogram
+    rank_sums = histogram * below + histogram * (histogram + 1) / 2
+    return 2 * (values * rank_sums).sum() / (n * total) - (n + 1) / n
+
+def stable(statistic, tolerance=0.01, generations=10):
+    """Stopping rule for OnlineAnalysis.follow: true once statistic has
+     changed by less than tolerance (relative) over the last generations"""
+    def stop(analysis):
+        if len(analysis.history) <= generations:
+            return False
+        now = analysis.history[-1][statistic]
+        then = analysis.history[-1 - generations][statistic]
+        return abs(now - then) <= tolerance * max(abs(then), 1e-12)
+    return stop
+
+
+class OnlineAnalysis(object):
+    """Statistics of a run kept up to date as its patents form, from each
+    Generation of Patents.stream(), with no pass over the finished graph:
+    - the number of descendants of each of the first num_founders patents
+    - the citation count of every patent, their histogram and Gini
+      coefficient
+    - the citations whose child and parent share keywords and how many they
+      share (every keyword counts, since which survive is not known yet),
+      given the phenomes as keywords.Phenomes
+
+    Each patent keeps a bitset of the founders it descends from (or is), so
+    every generation is one pass over its own citations."""
+
+    def __init__(self, num_records, num_founders=20, phenomes=None):
+        self.num_records = num_records
+        self.num_founders = num_founders
+        self.phenomes = phenomes
+
+        self.founders = numpy.zeros((num_records, bitsets.Bitsets.num_words(num_founders)),
+                                    dtype=bitsets.WORD)
+        # patents with each founder's bit, itself included
+        self.founder_counts = numpy.zeros(64 * self.founders.shape[1], dtype=numpy.int64)
+        self.citation_count = numpy.zeros(num_records, dtype=numpy.int64)
+        self.histogram = numpy.zeros(1, dtype=numpy.int64)
+        self.trait_count = numpy.zeros(phenomes.width if phenomes is not None else 0,
+                                       dtype=numpy.int64)
+
+        self.gen_num = -1
+        self.formed = 0
+        self.num_citations = 0
+        # citations sharing keywords, and the keywords they share
+        self.inheriting = 0
+        self.inherited = 0
+        self.history = []
+
+    def update(self, generation):
+        """Takes in a newly formed Generation and returns the statistics
+         after it"""
+        num_children = len(generation.num_parents)
+        children = numpy.repeat(numpy.arange(generation.first, generation.first + num_children),
+                                generation.num_parents)
+        parents = numpy.asarray(generation.parents, dtype=numpy.int64)
+
+        self.gen_num = generation.gen_num
+        self.formed = generation.first + num_children
+        self.num_citations += len(parents)
+        self.histogram[0] += num_children
+
+        self.count_citations(parents)
+        self.trace_founders(generation.first, generation.num_parents, parents)
+        if self.phenomes is not None:
+            self.count_inheritance(children, parents)
+
+        statistics = self.statistics()
+        self.history.append(statistics)
+        return statistics
+
+    def count_citations(self, parents):
+        """Citation counts and their histogram after parents are cited"""
+        cited, hits = numpy.unique(parents, return_counts=True)
+        before = self.citation_count[cited]
+        after = before + hits
+        self.citation_count[cited] = after
+        if len(after) and after.max() >= len(self.histogram):
+            grown = numpy.zeros(after.max() + 1, dtype=numpy.int64)
+            grown[:len(self.histogram)] = self.histogram
+            self.histogram = grown
+        numpy.subtract.at(self.histogram, before, 1)
+        numpy.add.at(self.histogram, after, 1)
+
+    def trace_founders(self, first, num_parents, parents):
+        """Founders of the new patents: those of their parents and the
+         parents themselves"""
+        new = numpy.arange(first, first + len(num_parents))
+        has = numpy.asarray(num_parents) > 0
+        if has.any():
+            starts = numpy.concatenate(([0], numpy.cumsum(num_parents)[:-1]))
+            words = numpy.bitwise_or.reduceat(self.founders[parents], starts[has], axis=0)
+            self.founders[new[has]] = words
+
+        # founders carry their own bit
+        own = new[new < self.num_founders]
+        self.founders[own, own // 64] |= numpy.left_shift(
+            numpy.ones(len(own), dtype=bitsets.WORD), (own % 64).astype(bitsets.WORD))
+
+        bits = bitsets.set_bits(self.founders[new])[1]
+        self.founder_counts += numpy.bincount(bits, minlength=len(self.founder_counts))
+
+    def count_inheritance(self, children, parents):
+        """Keywords shared over the new citations"""
+        pairs, keywords = self.phenomes.shared(children, parents)
+        self.inheriting += len(numpy.unique(pairs))
+        self.inherited += len(pairs)
+        self.trait_count += numpy.bincount(keywords, minlength=len(self.trait_count))
+
+    def descendant_counts(self):
+        """Number of descendants of each founder formed so far"""
+        formed = numpy.arange(self.num_founders) < self.formed
+        return self.founder_counts[:self.num_founders] - formed
+
+    def statistics(self):
+        """The statistics as they stand, as a dict"""
+        formed = max(self.formed, 1)
+        citations = max(self.num_citations, 1)
+        return {'gen_num': self.gen_num,
+                'formed': self.formed,
+                'citations': self.num_citations,
+                'mean_citations': self.num_citations / float(formed),
+                'max_citations': len(self.histogram) - 1,
+                'gini': gini(self.histogram),
+                'descendant_counts': self.descendant_counts().tolist(),
+                'inheriting': self.inheriting / float(citations),
+                'inherited': self.inherited / float(citations)}
+
+    def follow(self, stream, stop=None, report=None):
+        """Updates with every generation of stream (see Patents.stream),
+         calling report(statistics) after each, and stopping early once
+         stop(self) is true (see stable)"""
+        for generation in stream:
+            statistics = self.update(generation)
+            if report is not None:
+                report(statistics)
+            if stop is not None and stop(self):
+                break
+        return self
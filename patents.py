@@ -1,19 +1,110 @@
+import collections
 import csv
 import os
+import itertools
 import numpy
+import citations
 import rwg
 
 
 
+class AgingWeights(object):
+    """Array-backed weights for preferential attachment with aging.
+
+    The weight of patent i is (1 + k_i ^ w)(d_g ^ -a) where k_i is its citation
+    count and d_g the age of its generation g. The citation term is kept per
+    patent and only recomputed for the patents cited in the last generation;
+    the aging term is kept per generation. The citation terms of formed
+    patents live in the leaves of a sum-tree so that patents can also be
+    drawn without building the full probability vector."""
+
+    def __init__(self, num_records, gen_len, age_exp, cites_exp):
+        self.gen_len = gen_len
+        self.age_exp = age_exp
+        self.cites_exp = cites_exp
+        self.aging_coefficients = numpy.ones(0)
+        self.tree = rwg.SumTree(num_records)
+        self.cites_weights = self.tree.weights()
+        self.formed = 0
+
+    def update_cites(self, cited, citation_count):
+        """Recomputes the citation term of the formed patents which were
+         cited"""
+        cited = numpy.unique(numpy.asarray(cited, dtype=int))
+        cited = cited[cited < self.formed]
+        counts = numpy.asarray(citation_count)[cited].astype(float)
+        self.tree.update(cited, 1 + counts ** self.cites_exp)
+
+    def update_aging(self, now_forming):
+        """Aging coefficients for every generation formed so far. A generation
+         is as old as its "oldest" (lowest id) patent."""
+        num_gens = now_forming // self.gen_len
+        ages = now_forming - self.gen_len * numpy.arange(num_gens)
+        self.aging_coefficients = ages.astype(float) ** -self.age_exp
+
+        # patents formed since the last update become citable, uncited
+        formed = numpy.arange(self.formed, now_forming)
+        self.tree.update(formed, 1 + numpy.zeros(len(formed)) ** self.cites_exp)
+        self.formed = now_forming
+
+    def weights(self, now_forming):
+        """Weights of the patents formed before now_forming"""
+        aging = numpy.repeat(self.aging_coefficients, self.gen_len)
+        return self.cites_weights[:now_forming] * aging[:now_forming]
+
+    def sample(self, n):
+        """Draws n patents with replacement in proportion to their weights.
+         A generation is drawn by its aged share of the citation terms, then a
+         patent within it from the sum-tree."""
+        num_gens = len(self.aging_coefficients)
+        starts = self.tree.prefix(numpy.arange(num_gens + 1) * self.gen_len)
+        gen_mass = numpy.cumsum(self.aging_coefficients * numpy.diff(starts))
+        gens = numpy.searchsorted(gen_mass, numpy.random.random(n) * gen_mass[-1], side='right')
+        gens = numpy.minimum(gens, num_gens - 1)
+
+        targets = starts[gens] + numpy.random.random(n) * (starts[gens + 1] - starts[gens])
+        patents = self.tree.find(targets)
+        # keep round-off at the generation boundaries inside the generation
+        return numpy.clip(patents, gens * self.gen_len, (gens + 1) * self.gen_len - 1)
+
+
+# the patents formed in one generation: ids first onwards, and the parents
+# of each of them (num_parents[i] of parents for the i-th)
+Generation = collections.namedtuple('Generation', ['gen_num', 'first', 'num_parents', 'parents'])
+
+# the most records sampler='topk' forms (about 7s at 20000)
+TOPK_MAX_RECORDS = 20000
+
+
 class Patents(object):
 
 
     def __init__(self, num_records=1000, num_parents=5, dist='flat',
-                 min_parents=0, gen_len=100, age_exp=-1.45, cites_exp=2):
+                 min_parents=0, gen_len=100, age_exp=-1.45, cites_exp=2,
+                 sampler='pool', batch=False, output=True, history=True):
         self.num_records = num_records
         self.num_parents = num_parents
         # 'flat', 'ave' or 'poisson' 
         self.dist = dist
+        # 'pool' (multinomial pools), 'alias' (alias table draws), 'tree'
+        # (sum-tree draws) or 'topk' (distinct parents drawn straight from
+        # the weights, without replacement). 'topk' keys every child against
+        # every formed patent, so a run takes time in num_records**2: it is
+        # for exact draws on small runs, and 'tree' is for large ones.
+        if sampler == 'topk' and num_records > TOPK_MAX_RECORDS:
+            raise ValueError("sampler='topk' takes time in num_records**2; "
+                             "use sampler='tree' above %d records" % TOPK_MAX_RECORDS)
+        self.sampler = sampler
+        # assign a whole generation's citations at once
+        self.batch = batch
+        # write parentage.csv and citations.bin as the patents form (True),
+        # only the binary citations.bin ('binary') or nothing (False)
+        self.output = output
+        # keep the citation graph in memory. Without it only what sampling
+        # needs and the citation log stay resident: the log goes to
+        # citations.bin, or without output stays in memory (12 bytes a
+        # citation), and citation_graph() rebuilds the graph from it.
+        self.history = history
         self.gen_len = gen_len
         self.age_exp = age_exp
         self.cites_exp = cites_exp
@@ -33,12 +124,21 @@ class Patents(object):
     def define_prior_to_forming(self):
         """Calls the requisite procedures for patent formation"""
         self.define_citation_count()
+        self.define_graph()
         self.define_weights()
         self.open_files()
 
     def define_citation_count(self):
         """Initial citaiton count"""
-        self.citation_count = [0 for i in range(self.num_records)]
+        self.citation_count = numpy.zeros(self.num_records, dtype=numpy.int32)
+
+    def define_graph(self):
+        """CSR citation graph, built as the patents form"""
+        if not self.history:
+            self.builder = None
+            return
+        expected_edges = self.num_records * self.num_parents
+        self.builder = citations.CitationGraphBuilder(self.num_records, expected_edges)
 
     def define_weights(self):
         """Initial weights and probabilities"""
@@ -62,15 +162,21 @@ class Patents(object):
         return final_path
 
     def open_files(self):
-        """Opens a csv for the citation counts for each patent at t and the 
-        parentage of each patent"""
+        """Opens a csv for the parentage of each patent and a binary log of
+        every citation (see citations.CitationLog). Without output the log
+        is kept in memory, so that the graph and history can be rebuilt."""
+        if not self.output:
+            self.log = citations.CitationLog()
+            return
+
+        self.c_file = open('citations.bin', 'wb')
+        self.log = citations.CitationLog(self.c_file)
+        if self.output == 'binary':
+            return
+
         self.p_file = open('parentage.csv', 'wb')
-        self.c_file = open('counts.csv', 'wb')        
         #self.p_file = open(self.output_path('parentage'), 'wb') #for storage
-        #self.c_file = open(self.output_path('counts'), 'wb')
-
         self.p_writer = csv.writer(self.p_file)
-        self.c_writer = csv.writer(self.c_file)
         
     def close_file(self, f):
         """Dumps all remaining data into a file and then closes it"""
@@ -78,67 +184,124 @@ class Patents(object):
         os.fsync(f.fileno())    
         f.close()   
 
-    def new_counts_and_parentage(self):
-        """Starts a new list for the counts at t and the parentage to be dumped
-         into output files"""
-        self.counts = []
+    def new_parentage(self):
+        """Starts a new list for the parentage to be dumped into output files"""
         self.parentage = []
 
-    def first_counts_and_parentage(self):
-        """The first counts and parentages. These are special because the first
+    def first_parentage(self):
+        """The first parentages. These are special because the first
         generation of patents has no citations."""
         self.gen_num = 1
 
-        self.counts = [self.citation_count for i in range(self.gen_len)]
         self.parentage = ['' for i in range(self.gen_len)]
-        self.c_writer.writerows(self.counts)
-        self.p_writer.writerows(self.parentage)
+        self.write_parentage()
+        self.last_generation = Generation(0, 0, numpy.zeros(self.gen_len, dtype=int),
+                                          numpy.zeros(0, dtype=int))
+        if self.builder is not None:
+            self.builder.append(self.last_generation.num_parents, [])
 
-        self.new_counts_and_parentage()
+        self.new_parentage()
 
         self.new_pool()
 
+    def write_parentage(self):
+        """Dumps the parentage of the current generation into its output file"""
+        if self.output and self.output != 'binary':
+            self.p_writer.writerows(self.parentage)
+
     def cleanup(self):
         """Securely closes all open output files"""
-        self.close_file(self.p_file)
+        if not self.output:
+            return
         self.close_file(self.c_file)
+        if self.output != 'binary':
+            self.close_file(self.p_file)
         
 #==============================================================================
     def form_patents(self):
         """Initiates the formation of patents"""
-        self.first_counts_and_parentage()
+        for generation in self.stream():
+            pass
+
+    def stream(self):
+        """Forms the patents one generation at a time, yielding a Generation
+         as each is formed (the first generation, which cites nothing,
+         included)"""
+        self.first_parentage()
+        yield self.last_generation
         while self.now_forming + 1 < self.num_records:
             self.generation()
+            yield self.last_generation
 
     def generation(self):
         """Starts the first generation of patents. Patents in the same generation
         do not cite one another."""
-        while (self.gen_num + 1) * self.gen_len > self.now_forming:
-                self.citing()
+        if self.batch:
+            self.citing_generation()
+        else:
+            while (self.gen_num + 1) * self.gen_len > self.now_forming:
+                    self.citing()
         
         self.next_generation()
 
     def next_generation(self):
         """Wraps up the current generation and starts a new one"""
-        self.c_writer.writerows(self.counts)
-        self.p_writer.writerows(self.parentage)
-        self.new_counts_and_parentage()
+        self.write_parentage()
+        self.log_citations()
+        self.new_parentage()
 
         #print("Now forming patent_%i" % self.now_forming)
         self.update_weights()
         self.new_pool()
         self.gen_num += 1
         
+    def log_citations(self):
+        """Logs the citations made by the current generation"""
+        first = self.now_forming - len(self.parentage)
+        num_parents = numpy.array([len(parents) for parents in self.parentage], dtype=int)
+        parents = numpy.fromiter(itertools.chain.from_iterable(self.parentage), dtype=int)
+        self.last_generation = Generation(self.gen_num, first, num_parents, parents)
+
+        children = numpy.repeat(numpy.arange(first, self.now_forming), num_parents)
+        self.log.append(children, parents, self.gen_num)
+        if self.builder is not None:
+            self.builder.append(num_parents, parents)
+
+    def citation_graph(self):
+        """Parentage of every patent formed so far. Without history it is
+         rebuilt from the citation log."""
+        if self.builder is None:
+            return citations.CitationGraph.from_events(self.log.events(), self.now_forming)
+        return self.builder.graph()
+
+    def citation_history(self):
+        """Citation counts of any patent at any generation of this run"""
+        return citations.CitationHistory(self.log.events(), self.num_records)
+
     def citing(self):
         """Assigns the parents for the patents in the current generation"""
-        parents = set()
-        
         # number of parents for this patent 
         if self.dist == 'poisson':
             x = numpy.random.poisson(self.num_parents)
         else:
             x = numpy.random.randint(self.min_parents, self.max_parents+1) # randint is high exclusive
 
+        if self.sampler == 'topk':
+            x = min(x, self.now_forming//self.gen_len)
+            parents = rwg.top_k(x, self.weights).tolist()
+        else:
+            parents = self.pool_parents(x)
+              
+        for parent in parents:
+            self.update_count(parent)
+        self.parentage.append(list(parents))
+
+        # form next record
+        self.now_forming += 1
+
+    def pool_parents(self, x):
+        """Pops patents off the pool until x distinct parents are drawn"""
+        parents = set()
         while len(parents) < x:
             parent = self.pool.pop()
             parents.add(parent)
@@ -152,25 +315,80 @@ class Patents(object):
             # for new patents to cite when there are none
             if len(parents) == self.now_forming//self.gen_len:
                 break
-              
-        for parent in parents:
-            self.update_count(parent)
-        self.parentage.append(list(parents))
-        self.counts.append(self.citation_count)
+        return parents
 
-        # form next record
-        self.now_forming += 1
+    def citing_generation(self):
+        """Assigns the parents for every patent in the current generation at
+         once. As in citing, a patent has no more parents than there are
+         generations before its own."""
+        num_children = (self.gen_num + 1) * self.gen_len - self.now_forming
+
+        # number of parents for each patent
+        if self.dist == 'poisson':
+            x = numpy.random.poisson(self.num_parents, num_children)
+        else:
+            x = numpy.random.randint(self.min_parents, self.max_parents+1, num_children)
+        x = numpy.minimum(x, self.now_forming//self.gen_len)
+
+        children, parents = self.draw_parents(x)
+        self.update_counts(parents)
+
+        bounds = numpy.cumsum(x)[:-1]
+        self.parentage.extend(p.tolist() for p in numpy.split(parents, bounds))
+
+        # form next generation
+        self.now_forming += num_children
+
+    def draw_parents(self, num_parents):
+        """Draws num_parents[i] distinct parents for the i-th child. Duplicates
+         are dropped and the shortfall drawn again, which consumes the draws
+         in the same order as citing. Returns the children and parents of
+         every citation, sorted by child."""
+        if self.sampler == 'topk':
+            return rwg.top_k_rows(num_parents, self.weights)
+
+        children = numpy.repeat(numpy.arange(len(num_parents)), num_parents)
+        parents = self.draw(len(children))
+
+        while True:
+            order = numpy.lexsort((parents, children))
+            children, parents = children[order], parents[order]
+            distinct = numpy.ones(len(children), dtype=bool)
+            distinct[1:] = (children[1:] != children[:-1]) | (parents[1:] != parents[:-1])
+            children, parents = children[distinct], parents[distinct]
+
+            shortfall = num_parents - numpy.bincount(children, minlength=len(num_parents))
+            if not shortfall.any():
+                return children, parents
+            more = numpy.repeat(numpy.arange(len(num_parents)), shortfall)
+            children = numpy.concatenate((children, more))
+            parents = numpy.concatenate((parents, self.draw(len(more))))
+
+    def draw(self, n):
+        """Takes n patents from the pool, getting new pools as it runs dry"""
+        drawn = []
+        while n > len(self.pool):
+            drawn += self.pool
+            n -= len(self.pool)
+            self.new_pool()
+        drawn += self.pool[len(self.pool)-n:]
+        del self.pool[len(self.pool)-n:]
+        return numpy.array(drawn, dtype=int)
 
     def update_count(self, citation):
         """When a patent is cited, it's count is incremented"""
         self.citation_count[citation] += 1
 
+    def update_counts(self, citations):
+        """Increments the count of every cited patent at once"""
+        numpy.add.at(self.citation_count, citations, 1)
+
     def update_weights(self):
         """Update the weights and probs according to the number of children each patent
          had at the end of the last generation""" 
-        self.summed_weights = sum(self.weights)
-        self.probs = [weight/float(self.summed_weights) for weight in self.weights]
-        #self.probs = numpy.array(self.weights)/float(self.summed_weights)
+        self.weights = numpy.asarray(self.weights, dtype=float)
+        self.summed_weights = self.weights.sum()
+        self.probs = self.weights / self.summed_weights
 
     def write_count(self):
         """Write the last set of citation counts for each patent at the end of
@@ -182,17 +400,32 @@ class Patents(object):
 
 class Uniform(Patents):
 
-    def form_patents(self):
+    def define_prior_to_forming(self):
+        """Calls the procedures required for patent formation"""
+        super(Uniform, self).define_prior_to_forming()
+        if self.sampler == 'tree':
+            self.tree = rwg.SumTree(self.num_records)
+            self.formed = 0
+
+    def stream(self):
         """Initiates the formation of patents"""
         self.now_forming = self.gen_len
         self.new_pool()
-        super(Uniform, self).form_patents()
+        return super(Uniform, self).stream()
 
     def new_pool(self):
         """Sample with maximum entropy"""
         n = self.gen_len * self.num_parents * 30
         upper_bound = (self.now_forming - (self.now_forming % self.gen_len) - 1) # randint() includes upper bound       
-        self.pool = [randint(0, upper_bound) for i in range(n)]
+        if self.sampler == 'tree':
+            # patents formed since the last pool become citable
+            self.tree.update(numpy.arange(self.formed, upper_bound + 1), 1)
+            self.formed = upper_bound + 1
+            self.pool = self.tree.sample(n).tolist()
+        elif self.sampler == 'topk':
+            self.weights = numpy.ones(upper_bound + 1)
+        else:
+            self.pool = numpy.random.randint(0, upper_bound + 1, n).tolist()
 
 class PrefAging(Patents):
 
@@ -201,35 +434,62 @@ class PrefAging(Patents):
         super(PrefAging, self).define_prior_to_forming()
         self.define_aging_coefficients()
 
-    def form_patents(self):
+    def stream(self):
         """Initiates the formation of patents"""
         self.now_forming = self.gen_len
         self.update_weights()
-        super(PrefAging, self).form_patents()
+        return super(PrefAging, self).stream()
 
     def new_pool(self):
         "Gets a new pool (of patent IDs) from which to draw citaitons"""
         n = self.gen_len * self.num_parents * 2
-        self.pool = rwg.generate(n, self.probs)
+        if self.sampler == 'topk':
+            # parents are drawn straight from the weights
+            return
+        if self.sampler == 'tree':
+            self.pool = self.aging.sample(n).tolist()
+        elif self.sampler == 'alias':
+            self.pool = self.table.sample(n).tolist()
+        else:
+            self.pool = rwg.generate_pool(n, self.probs).tolist()
 
     def define_aging_coefficients(self):
         """Get the aging coefficients for the first generation"""
-        self.aging_coefficients = []
-        for i in range(self.gen_len):
-            self.aging_coefficients.append(1)
-    
+        self.aging = AgingWeights(self.num_records, self.gen_len,
+                                  self.age_exp, self.cites_exp)
+        self.cited = []
+
+    def update_count(self, citation):
+        """When a patent is cited, it's count is incremented and it is marked
+         for reweighting at the end of the generation"""
+        super(PrefAging, self).update_count(citation)
+        self.cited.append(citation)
+
+    def update_counts(self, citations):
+        """Increments the counts of the cited patents and marks them for
+         reweighting at the end of the generation"""
+        super(PrefAging, self).update_counts(citations)
+        self.cited.extend(citations)
+
     def update_weights(self):
         """Updates the weights and probs according the patents generation and
          prior hit count.""" 
         self.update_aging_coefficients()
         # probability(k) ~ (1 + k ^ w)(d^-a) where k is the patent, w is the prior cites weight,
         # d is the age (t - i), and a is the aging attachment factor
-        self.weights = [(1 + (self.citation_count[i] ** self.cites_exp)) * self.aging_coefficients[i//self.gen_len] for i in range(self.now_forming)]
+        self.aging.update_cites(self.cited, self.citation_count)
+        self.cited = []
+        # the sum-tree draws without the full probability vector
+        if self.sampler == 'tree':
+            return
+        self.weights = self.aging.weights(self.now_forming)
 
         super(PrefAging, self).update_weights()
+        # one table serves every pool of the generation
+        if self.sampler == 'alias':
+            self.table = rwg.AliasTable(self.probs)
 
     def update_aging_coefficients(self):
-        """Inserts the new "oldest" coefficient of the oldest generation at the
-         front of the list. Aging coefficients for each generation are assinged
-         by the "age" (id) of the "oldest" (lowest id) in the generation"""
-        self.aging_coefficients.insert(0, self.now_forming ** -self.age_exp)
\ No newline at end of file
+        """Aging coefficients for each generation are assinged by the "age"
+         (id) of the "oldest" (lowest id) in the generation"""
+        self.aging.update_aging(self.now_forming)
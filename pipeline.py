@@ -0,0 +1,86 @@
+import patents
+import keywords
+import networkanalysis
+import online
+
+
+
+# every function here defaults to the small replicates the drivers run,
+# not to the models' own defaults
+def prepare(num_records=200, num_parents=1, dist='poisson', gen_len=20, age_exp=1,
+            cites_exp=1, model=patents.PrefAging, output=False, **options):
+    """The patents, ready to form"""
+    return model(num_records=num_records,
+                 num_parents=num_parents,
+                 dist=dist,
+                 min_parents=0,
+                 gen_len=gen_len,
+                 age_exp=age_exp,
+                 cites_exp=cites_exp,
+                 output=output,
+                 **options)
+
+def cite(num_records=200, num_parents=1, dist='poisson', gen_len=20, age_exp=1,
+         cites_exp=1, model=patents.PrefAging, output=False, **options):
+    """Forms the patents in memory. With output, also writes parentage.csv,
+     citations.bin and final_count.csv."""
+    some_patents = prepare(num_records, num_parents, dist, gen_len, age_exp,
+                           cites_exp, model, output, **options)
+    some_patents.form_patents()
+
+    if output:
+        some_patents.write_count()
+        some_patents.cleanup()
+    return some_patents
+
+def keyword(num_records=200, num_traits=1, num_keywords=2, output=False):
+    """Assigns keywords in memory. With output, also writes phenomes.csv."""
+    key_up = keywords.Keywords(num_records=num_records,
+                               num_traits=num_traits,
+                               avg=False,
+                               min_traits=0,
+                               num_keywords=num_keywords,
+                               gen_len=num_traits)
+    key_up.assign_keywords()
+
+    if output:
+        key_up.write_phenomes()
+    return key_up
+
+def analyze(some_patents, key_up, num_traits=1, num_keywords=2, gen_len=20,
+            bitsets=False):
+    """NetworkAnalysis of the patents and keywords, straight from memory"""
+    return networkanalysis.NetworkAnalysis(some_patents.citation_graph(),
+                                           key_up.phenomes,
+                                           some_patents.citation_count,
+                                           num_traits=num_traits,
+                                           num_keywords=num_keywords,
+                                           gen_len=gen_len,
+                                           bitsets=bitsets)
+
+def run(num_records=200, num_parents=1, dist='poisson', gen_len=20, num_traits=1,
+        num_keywords=2, age_exp=1, cites_exp=1, output=False, bitsets=False,
+        **options):
+    """Simulates, keywords and analyzes one network. Returns the
+     NetworkAnalysis after first_degree_chains."""
+    some_patents = cite(num_records, num_parents, dist, gen_len, age_exp,
+                        cites_exp, output=output, **options)
+    key_up = keyword(num_records, num_traits, num_keywords, output=output)
+
+    na = analyze(some_patents, key_up, num_traits, num_keywords, gen_len, bitsets)
+    na.first_degree_chains()
+    return na
+
+def follow(num_records=200, num_parents=1, dist='poisson', gen_len=20, num_traits=1,
+           num_keywords=2, age_exp=1, cites_exp=1, num_founders=None, stop=None,
+           report=None, **options):
+    """Simulates and keywords one network, analyzing every generation as it
+     forms (see online.OnlineAnalysis) and stopping early once
+     stop(analysis) is true. Only what sampling needs of the graph is kept
+     unless history is given. Returns the OnlineAnalysis."""
+    options.setdefault('history', False)
+    key_up = keyword(num_records, num_traits, num_keywords)
+    some_patents = prepare(num_records, num_parents, dist, gen_len, age_exp,
+                           cites_exp, **options)
+    analysis = online.OnlineAnalysis(num_records, num_founders or gen_len, key_up.phenomes)
+    return analysis.follow(some_patents.stream(), stop, report)
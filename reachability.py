@@ -0,0 +1,130 @@
+import numpy
+import lineage
+
+
+
+class ReachabilityIndex(object):
+    """Answers "does u reach v" in a DAG (a patent and its descendants, over
+    graph.children()) without building anyone's set of descendants.
+
+    Every node is labelled once, by one depth-first traversal:
+    - its level: no node reaches a node at its own level or before
+    - its pre- and post-order ranks: v is below u in the traversal's tree, so
+      reached, if u's ranks bracket v's
+    - the lowest post-order rank below it: u reaches v only if u's range of
+      post-order ranks holds v's (GRAIL)
+    Most pairs are settled by the labels alone. The rest are searched for,
+    skipping every node the labels rule out, or when there are many of them
+    from one node, settled by one walk from it."""
+
+    def __init__(self, rows, transposed, max_searches=32):
+        # rows are the nodes each node points to (its children) and
+        # transposed those pointing to it (its parents)
+        self.rows = rows
+        # pairs left to search for above which one walk from the source
+        # settles them instead
+        self.max_searches = max_searches
+        self.num_nodes = len(rows)
+        levels = transposed.levels(rows)
+        self.level = numpy.empty(self.num_nodes, dtype=numpy.int64)
+        for depth, level in enumerate(levels):
+            self.level[level] = depth
+        self.label(levels)
+
+        # lists for the searches, which look at one node at a time
+        self.indptr = rows.indptr.tolist()
+        self.indices = rows.indices.tolist()
+        self.level_list = self.level.tolist()
+        self.pre_list = self.pre.tolist()
+        self.post_list = self.post.tolist()
+        self.low_list = self.low.tolist()
+
+    def label(self, levels):
+        """Pre- and post-order ranks of a depth-first traversal from the
+         roots (the first level), and the lowest post-order rank below every
+         node"""
+        indptr = self.rows.indptr.tolist()
+        indices = self.rows.indices.tolist()
+        pre = [0] * self.num_nodes
+        post = [0] * self.num_nodes
+        visited = [False] * self.num_nodes
+        pre_rank = post_rank = 0
+
+        for root in (levels[0].tolist() if levels else []):
+            visited[root] = True
+            pre[root] = pre_rank
+            pre_rank += 1
+            stack = [[root, indptr[root]]]
+            while stack:
+                top = stack[-1]
+                node, position = top
+                if position < indptr[node+1]:
+                    top[1] += 1
+                    child = indices[position]
+                    if not visited[child]:
+                        visited[child] = True
+                        pre[child] = pre_rank
+                        pre_rank += 1
+                        stack.append([child, indptr[child]])
+                else:
+                    stack.pop()
+                    post[node] = post_rank
+                    post_rank += 1
+
+        self.pre = numpy.array(pre, dtype=numpy.int64)
+        self.post = numpy.array(post, dtype=numpy.int64)
+
+        # lowest post-order rank below each node, deepest levels first
+        self.low = self.post.copy()
+        for level in reversed(levels):
+            entries = self.rows.take(level)
+            has = entries.lengths() > 0
+            if has.any():
+                lows = numpy.minimum.reduceat(self.low[entries.indices], entries.indptr[:-1][has])
+                self.low[level[has]] = numpy.minimum(self.low[level[has]], lows)
+
+    def reaches(self, u, v):
+        """Whether there is a path from u to v"""
+        return bool(self.reaches_all(u, [v])[0])
+
+    def reaches_all(self, u, targets):
+        """Whether there is a path from u to each of targets, as a boolean
+         array"""
+        targets = numpy.asarray(targets, dtype=numpy.int64)
+        below = (self.pre[u] < self.pre[targets]) & (self.post[targets] < self.post[u])
+        possible = ((self.level[u] < self.level[targets]) &
+                    (self.low[u] <= self.low[targets]) & (self.post[targets] < self.post[u]))
+
+        reached = below.copy()
+        undecided = numpy.flatnonzero(possible & ~below)
+        if len(undecided) > self.max_searches:
+            # one walk over all that u reaches settles the rest at once
+            reached[undecided] = numpy.isin(targets[undecided], lineage.reachable(self.rows, u))
+            return reached
+        for i in undecided.tolist():
+            reached[i] = self.search(u, int(targets[i]))
+        return reached
+
+    def reached_from(self, sources, targets):
+        """Whether any of sources has a path to each of targets"""
+        reached = numpy.zeros(len(targets), dtype=bool)
+        for u in sources:
+            reached |= self.reaches_all(u, targets)
+        return reached
+
+    def search(self, u, v):
+        """Depth-first search for v from u, not entering nodes whose labels
+         show that they cannot reach v"""
+        level, pre, post, low = self.level_list, self.pre_list, self.post_list, self.low_list
+        stack = [u]
+        seen = set(stack)
+        while stack:
+            node = stack.pop()
+            for child in self.indices[self.indptr[node]:self.indptr[node+1]]:
+                if child == v or (pre[child] < pre[v] and post[v] < post[child]):
+                    return True
+                if child in seen or level[child] >= level[v] or low[child] > low[v] or post[v] > post[child]:
+                    continue
+                seen.add(child)
+                stack.append(child)
+        return False
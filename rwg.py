@@ -17,4 +17,151 @@ def generate(n, probs):
         for n in range(num_instances):
             instances.append(i)
     shuffle(instances)
-    return instances
\ No newline at end of file
+    return instances
+
+def generate_pool(n, probs):
+    """generate without the Python loops: a multinomial sample of n expanded
+     into its instances and shuffled, as an array"""
+    samples = numpy.random.multinomial(n, probs)
+    instances = numpy.repeat(numpy.arange(len(samples)), samples)
+    return numpy.random.permutation(instances)
+
+def top_k(k, weights):
+    """Draws k distinct indices without replacement, each in proportion to
+     the weights not yet drawn, in the order they were drawn"""
+    return top_k_rows([k], weights)[1]
+
+def top_k_rows(ks, weights, max_keys=2**22):
+    """Draws ks[r] distinct indices for every row r, independently, by
+     Efraimidis-Spirakis exponential keys: the k smallest of E/w, E
+     exponential, are a weighted draw of k without replacement. Returns the
+     row and index of every draw, by row and then in draw order. Every row
+     keys every weight, so this takes time in len(ks) * len(weights); rows
+     are keyed in chunks of at most max_keys keys, which bounds only the
+     memory. No row should draw more indices than there are positive
+     weights."""
+    weights = numpy.asarray(weights, dtype=float)
+    ks = numpy.minimum(numpy.asarray(ks, dtype=int), len(weights))
+    chunk_rows = max(1, max_keys // max(1, len(weights)))
+
+    rows, indices = [], []
+    for start in range(0, len(ks), chunk_rows):
+        chunk = ks[start:start + chunk_rows]
+        k = chunk.max()
+        if k <= 0:
+            continue
+        with numpy.errstate(divide='ignore'):
+            keys = numpy.random.exponential(size=(len(chunk), len(weights))) / weights
+        # the k smallest keys of each row, then sorted into draw order
+        r = numpy.arange(len(chunk))[:, None]
+        smallest = numpy.argpartition(keys, k - 1, axis=1)[:, :k]
+        smallest = smallest[r, numpy.argsort(keys[r, smallest], axis=1)]
+
+        drawn = numpy.arange(k) < chunk[:, None]
+        rows.append(numpy.nonzero(drawn)[0] + start)
+        indices.append(smallest[drawn])
+
+    if not rows:
+        return numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int)
+    return numpy.concatenate(rows), numpy.concatenate(indices)
+
+
+class AliasTable(object):
+    """Walker/Vose alias table for a fixed probability vector. Built once in a
+    few vectorized passes, after which every draw is one uniform column and
+    one coin flip between the column and its alias."""
+
+    def __init__(self, probs):
+        probs = numpy.asarray(probs, dtype=float)
+        self.n = len(probs)
+        scaled = probs * self.n / probs.sum()
+        self.prob = numpy.ones(self.n)
+        self.alias = numpy.arange(self.n)
+
+        small = numpy.flatnonzero(scaled < 1)
+        large = numpy.flatnonzero(scaled >= 1)
+        while len(small) and len(large):
+            # lay the smalls' deficits end to end along the larges' surplus
+            # and give each small the large its deficit starts in
+            deficit = 1 - scaled[small]
+            starts = numpy.cumsum(deficit) - deficit
+            surplus = numpy.cumsum(scaled[large] - 1)
+            fits = starts < surplus[-1]
+            if not fits.any():
+                break
+            small, deficit, rest = small[fits], deficit[fits], small[~fits]
+            owner = numpy.searchsorted(surplus, starts[fits], side='right')
+
+            self.prob[small] = scaled[small]
+            self.alias[small] = large[owner]
+            scaled[large] -= numpy.bincount(owner, weights=deficit, minlength=len(large))
+
+            # larges overdrawn by the deficit that straddled their end are
+            # now small themselves
+            small = numpy.concatenate((rest, large[scaled[large] < 1]))
+            large = large[scaled[large] >= 1]
+        # whatever is left is full up to round-off
+
+    def sample(self, n):
+        """Draws n indices with replacement"""
+        columns = numpy.random.randint(0, self.n, n)
+        keep = numpy.random.random(n) < self.prob[columns]
+        return numpy.where(keep, columns, self.alias[columns])
+
+class SumTree(object):
+    """Binary sum-tree over n weights. Point updates, prefix sums and draws
+    are O(log n) each, and batches of them run level by level in numpy."""
+
+    def __init__(self, n):
+        self.n = n
+        self.leaves = 1
+        while self.leaves < n:
+            self.leaves *= 2
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = numpy.zeros(2 * self.leaves)
+
+    def total(self):
+        """Sum of all weights"""
+        return self.tree[1]
+
+    def weights(self):
+        """The weights at the leaves"""
+        return self.tree[self.leaves:self.leaves + self.n]
+
+    def update(self, indices, weights):
+        """Sets the weights at indices and recomputes the sums above them"""
+        nodes = numpy.asarray(indices, dtype=int) + self.leaves
+        if nodes.size == 0:
+            return
+        self.tree[nodes] = weights
+        for level in range(self.depth):
+            nodes = numpy.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def prefix(self, indices):
+        """Sum of the weights before each index"""
+        indices = numpy.asarray(indices, dtype=int)
+        sums = numpy.zeros(indices.shape)
+        nodes = numpy.ones(indices.shape, dtype=int)
+        clipped = numpy.minimum(indices, self.leaves - 1)
+        for level in range(self.depth - 1, -1, -1):
+            right = (clipped >> level) & 1
+            sums += self.tree[2 * nodes] * right
+            nodes = 2 * nodes + right
+        return numpy.where(indices >= self.leaves, self.total(), sums)
+
+    def find(self, targets):
+        """Index of the weight in which each cumulative target falls"""
+        targets = numpy.array(targets, dtype=float)
+        nodes = numpy.ones(targets.shape, dtype=int)
+        for level in range(self.depth):
+            left = self.tree[2 * nodes]
+            # never walk into an empty subtree on round-off
+            right = (targets >= left) & (self.tree[2 * nodes + 1] > 0)
+            targets -= left * right
+            nodes = 2 * nodes + right
+        return nodes - self.leaves
+
+    def sample(self, n):
+        """Draws n indices with replacement in proportion to their weights"""
+        return self.find(numpy.random.random(n) * self.total())
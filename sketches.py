@@ -0,0 +1,138 @@
+import numpy
+import closure
+
+
+
+def bit_length(x):
+    """Number of bits needed for each of an array of uint64"""
+    x = numpy.array(x, dtype=numpy.uint64)
+    length = numpy.zeros(x.shape, dtype=numpy.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = (x >> numpy.uint64(shift)) > 0
+        length += shift * big
+        x[big] >>= numpy.uint64(shift)
+    return length + (x > 0)
+
+def hash64(x):
+    """splitmix64 of each of an array of ints"""
+    z = numpy.asarray(x, dtype=numpy.uint64) + numpy.uint64(0x9E3779B97F4A7C15)
+    with numpy.errstate(over='ignore'):
+        z = (z ^ (z >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+    return z ^ (z >> numpy.uint64(31))
+
+def relative_errors(estimates, exact):
+    """|estimate - exact| / exact, taking exact counts of 0 as 1"""
+    exact = numpy.asarray(exact, dtype=float)
+    return numpy.abs(numpy.asarray(estimates) - exact) / numpy.maximum(exact, 1)
+
+
+def estimate(registers):
+    """HyperLogLog estimates of the counts sketched in each row of
+     registers"""
+    m = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    harmonic = numpy.ldexp(1.0, -registers.astype(numpy.int32)).sum(axis=1)
+    estimates = alpha * m * m / harmonic
+
+    # few distinct rows: count the empty registers instead
+    empty = (registers == 0).sum(axis=1)
+    small = (estimates <= 2.5 * m) & (empty > 0)
+    estimates[small] = m * numpy.log(float(m) / empty[small])
+    return estimates
+
+
+class ReachSketches(object):
+    """HyperLogLog estimates of the number of rows reachable from every row
+    of a graph of CSR rows whose entries are rows (the descendants of every
+    patent, over graph.children()). Each row's sketch is the register-wise
+    max of those of its entries and of the entries themselves, so filling
+    them in level by level from the deepest takes one pass over the edges.
+
+    There are 2^precision one-byte registers per sketch, for a standard
+    error of about 1.04 / sqrt(2^precision) in every count. A sketch is
+    kept only until every row it is an entry of has been filled in, so
+    memory goes with the widest span of rows still to be read, not with
+    all of them."""
+
+    def __init__(self, rows, transposed, precision=10):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.rows = rows
+        self.transposed = transposed
+        self.precision = precision
+        self.num_registers = 2 ** precision
+
+        # the register each row sets and the rank it sets it to
+        hashes = hash64(numpy.arange(len(rows)))
+        self.register = (hashes >> numpy.uint64(64 - precision)).astype(numpy.int64)
+        rest = hashes & numpy.uint64(2 ** (64 - precision) - 1)
+        self.rank = (64 - precision - bit_length(rest) + 1).astype(numpy.uint8)
+
+        self.estimates = numpy.zeros(len(rows))
+        self.sketch_all()
+
+    def sketch_all(self):
+        """Fills in every row's sketch and estimate, rows without entries first"""
+        # slot in the pool of each kept sketch (-1: not kept, all zeros)
+        self.slots = numpy.full(len(self.rows), -1, dtype=numpy.int64)
+        self.pool = numpy.zeros((64, self.num_registers), dtype=numpy.uint8)
+        self.free = list(range(len(self.pool)))
+        self.peak = 0
+        # rows each sketch has yet to be read by
+        readers = self.transposed.lengths()
+
+        for level in self.rows.levels(self.transposed):
+            registers = self.sketch(level)
+            self.estimates[level] = estimate(registers)
+
+            entries = self.rows.take(level).indices
+            numpy.subtract.at(readers, entries, 1)
+            self.release(numpy.unique(entries[readers[entries] == 0]))
+            keep = (readers[level] > 0) & registers.any(axis=1)
+            self.store(level[keep], registers[keep])
+
+    def sketch(self, level):
+        """Sketches of the rows of a level, from those of their entries"""
+        entries = self.rows.take(level)
+        registers = numpy.zeros((len(level), self.num_registers), dtype=numpy.uint8)
+        has = entries.lengths() > 0
+        if not has.any():
+            return registers
+
+        merged = numpy.zeros((len(entries.indices), self.num_registers), dtype=numpy.uint8)
+        slots = self.slots[entries.indices]
+        merged[slots >= 0] = self.pool[slots[slots >= 0]]
+        edges = numpy.arange(len(entries.indices))
+        column = self.register[entries.indices]
+        merged[edges, column] = numpy.maximum(merged[edges, column], self.rank[entries.indices])
+        registers[has] = numpy.maximum.reduceat(merged, entries.indptr[:-1][has], axis=0)
+        return registers
+
+    def store(self, rows, registers):
+        """Keeps the sketches of rows in the pool, growing it as needed"""
+        while len(self.free) < len(rows):
+            grown = numpy.zeros((2 * len(self.pool), self.num_registers), dtype=numpy.uint8)
+            grown[:len(self.pool)] = self.pool
+            self.free.extend(range(len(self.pool), len(grown)))
+            self.pool = grown
+        slots = [self.free.pop() for row in rows]
+        self.slots[rows] = slots
+        self.pool[slots] = registers
+        self.peak = max(self.peak, len(self.pool) - len(self.free))
+
+    def release(self, rows):
+        """Gives up the slots of sketches no row will read again"""
+        slots = self.slots[rows]
+        self.free.extend(slots[slots >= 0].tolist())
+        self.slots[rows] = -1
+
+    def counts(self):
+        """Estimated number of rows reachable from every row"""
+        return self.estimates
+
+    def errors(self, budget=2**30):
+        """Errors of the estimates relative to the exact counts of
+         closure.Closure, for graphs small enough to have them"""
+        exact = closure.Closure(self.rows, self.transposed, budget).counts()
+        return relative_errors(self.counts(), exact)
@@ -0,0 +1,58 @@
+import itertools
+import multiprocessing
+import random
+import numpy
+
+
+
+def seed_replicate(seed, index):
+    """Seeds numpy and random with a stream of their own for one replicate.
+     The stream depends only on the sweep's seed and the replicate's index,
+     never on which worker runs it."""
+    numpy.random.seed([seed, index])
+    random.seed(int(numpy.random.randint(2**31)))
+
+def run_replicate(task):
+    """Runs one replicate in a worker"""
+    measure, params, seed, index = task
+    seed_replicate(seed, index)
+    return measure(**params)
+
+def combinations(grid, constants=None):
+    """Every combination of the values in grid, a list of (name, values)
+     pairs, varying the last name fastest. Each is a dict of parameters,
+     including the constants."""
+    names = [name for name, values in grid]
+    for values in itertools.product(*[values for name, values in grid]):
+        params = dict(constants or {})
+        params.update(zip(names, values))
+        yield params
+
+def sweep(measure, grid, replicates=1, seed=0, processes=None, constants=None):
+    """Calls measure(**params) replicates times for every combination of
+     parameters, spread over a pool of processes (all cores by default; 1 runs
+     in this process). measure must be a module-level function and should
+     keep its outputs in memory (see pipeline.run), since every worker shares
+     the working directory.
+
+     Returns a list of (params, results) in grid order, where results holds
+     the measure of every replicate in order. Results are the same for any
+     number of processes."""
+    all_params = list(combinations(grid, constants))
+    tasks = [(measure, params, seed, i * replicates + r)
+             for i, params in enumerate(all_params) for r in range(replicates)]
+
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1:
+        results = [run_replicate(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            chunksize = max(1, len(tasks) // (4 * processes))
+            results = list(pool.imap(run_replicate, tasks, chunksize))
+        finally:
+            pool.close()
+            pool.join()
+
+    return [(params, results[i*replicates:(i+1)*replicates])
+            for i, params in enumerate(all_params)]
@@ -0,0 +1,34 @@
+import numpy
+import bitsets
+
+
+
+def random_sets(num_sets=300, num_bits=150):
+    numpy.random.seed(6)
+    return [frozenset(numpy.random.randint(0, num_bits, numpy.random.randint(0, 6)).tolist())
+            for i in range(num_sets)]
+
+def test_bitsets_round_trip_and_count_their_sets():
+    sets = random_sets()
+    packed = bitsets.Bitsets.from_sets(sets, 150)
+    assert packed.words.shape == (300, 3)
+    assert list(packed) == sets
+    assert packed.counts().tolist() == [len(s) for s in sets]
+    assert packed[7] == sets[7]
+
+    rows, bits = bitsets.set_bits(packed.words, chunk_bits=128)
+    assert sorted(zip(rows.tolist(), bits.tolist())) == sorted(
+        (i, bit) for i, s in enumerate(sets) for bit in s)
+
+def test_bitset_operations_match_frozensets():
+    sets = random_sets()
+    packed = bitsets.Bitsets.from_sets(sets, 150)
+    a = numpy.arange(0, 300, 2)
+    b = numpy.arange(1, 300, 2)
+    within = frozenset(range(60, 140))
+    mask = packed.mask(list(within) + ['top', 500])
+
+    shared = bitsets.popcount(packed.intersections(a, b, mask))
+    assert shared.tolist() == [len(sets[i] & sets[j] & within) for i, j in zip(a, b)]
+    assert packed.intersects(mask).tolist() == [bool(s & within) for s in sets]
+    assert packed.bits(packed.union(a)).tolist() == sorted(frozenset().union(*[sets[i] for i in a]))
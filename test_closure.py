@@ -0,0 +1,43 @@
+import numpy
+import pytest
+import citations
+import closure
+
+
+
+def random_graph(num_records=300):
+    """Patents citing about two earlier patents each"""
+    numpy.random.seed(8)
+    children = numpy.repeat(numpy.arange(1, num_records), numpy.random.poisson(2, num_records - 1))
+    parents = (numpy.random.random(len(children)) * children).astype(int)
+    keys = numpy.unique(children * num_records + parents)
+    return citations.CitationGraph.from_rows(keys // num_records, keys % num_records, num_records)
+
+def bfs(rows, i):
+    """Every row reachable from row i, sorted"""
+    seen, stack = set(), [i]
+    while stack:
+        for j in rows[stack.pop()].tolist():
+            if j not in seen:
+                seen.add(j)
+                stack.append(j)
+    return sorted(seen)
+
+def test_closure_matches_bfs_both_ways_across_blocks():
+    graph = random_graph()
+    children = graph.children()
+    # a small budget splits the columns into blocks
+    for budget in (2**30, 2**15):
+        ancestors = closure.Closure(graph, children, budget)
+        descendants = closure.Closure(children, graph, budget)
+        assert len(ancestors.blocks) == (1 if budget == 2**30 else 2)
+        for i in range(len(graph)):
+            assert ancestors[i].tolist() == bfs(graph, i)
+            assert descendants[i].tolist() == bfs(children, i)
+        assert descendants.counts().tolist() == [len(bfs(children, i)) for i in range(len(graph))]
+        assert descendants.contains(0, 299) == (299 in bfs(children, 0))
+
+def test_closure_over_budget_raises_memory_error():
+    graph = random_graph()
+    with pytest.raises(MemoryError):
+        closure.Closure(graph.children(), graph, budget=10000)
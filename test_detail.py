@@ -0,0 +1,105 @@
+import numpy
+import detail
+import lineage
+from test_closure import random_graph
+
+
+
+def looped_grid(starting_node, ending_node, nodes_per_gen, xmax, ymax, starting_y, num_rows):
+    """Grid positions as NetworkAnalysis.grid placed them, one at a time"""
+    positions = []
+    y, x = starting_y, 0
+    yincr = float(ymax) / (num_rows - 1)
+    for n in range(starting_node, ending_node):
+        positions.append((n, x, y))
+        x += float(xmax) / (nodes_per_gen - 1)
+        if (n + 1) % nodes_per_gen == 0:
+            x = 0
+            y -= yincr
+    return numpy.array(positions)
+
+def looped_pyramid(limits, xmax, ymax, num_rows):
+    """Pyramid positions as NetworkAnalysis.pyramid placed them"""
+    xmax, ymax = float(xmax), float(ymax)
+    y, yprime = ymax, 0
+    yincr = ymax / (num_rows - 1)
+    positions = [(0, xmax / 2, y)]
+    for range_min, range_max in limits:
+        yprime += yincr
+        y -= yincr
+        row_width = (yprime * xmax) / (yincr * (len(limits) + 1))
+        x = xmax / 2 - row_width / 2
+        for n in range(range_min, range_max):
+            positions.append((n, x, y))
+            x += row_width / (range_max - range_min - 1)
+    return numpy.array(positions), y - yincr
+
+def test_grid_positions_match_the_loop():
+    for starting_node, ending_node in ((0, 1000), (100, 1000), (130, 777)):
+        expected = looped_grid(starting_node, ending_node, 20, 30, 5, 25, 15)
+        ids = numpy.arange(starting_node, ending_node)
+        x, y = detail.grid_positions(ids, starting_node, 20, 30, 5, 25, 15)
+        assert numpy.allclose(numpy.column_stack((ids, x, y)), expected)
+
+def test_pyramid_positions_match_the_loop():
+    limits = [(1, 3), (3, 13), (13, 33), (33, 63), (63, 100)]
+    expected, starting_y = looped_pyramid(limits, 30, 30, 15)
+    ids, x, y, after = detail.pyramid_positions(limits, 30, 30, 15)
+    assert numpy.allclose(numpy.column_stack((ids, x, y)), expected)
+    assert numpy.isclose(after, starting_y)
+
+def test_compact_rows_fill_the_grid_with_kept_generations():
+    ids = numpy.array([3, 5, 250, 251, 980, 999])
+    rows, num_rows = detail.compact_rows(ids, 100)
+    assert rows.tolist() == [0, 0, 1, 1, 2, 2]
+    assert num_rows == 3
+    x, y = detail.grid_positions(ids, 0, 100, 30, 30, 30, num_rows, rows)
+    assert y.tolist() == [30, 30, 15, 15, 0, 0]
+    assert numpy.allclose(x, (ids % 100) * 30. / 99)
+
+def test_top_descendants_are_closed_upward():
+    graph = random_graph(500)
+    counts = numpy.array([len(lineage.reachable(graph.children(), i)) for i in range(500)])
+    for budget in (10, 50, 200):
+        kept = detail.top_descendants(counts, budget)
+        assert kept.sum() == budget
+        children, parents = graph.edges()
+        assert kept[parents[kept[children]]].all()
+        # the rest have no more descendants than any kept
+        assert counts[~kept].max() <= counts[kept].min()
+
+def test_stratified_keeps_each_generations_share():
+    scores = numpy.random.RandomState(10).random_sample(1000)
+    kept = detail.stratified(1000, 100, 55, scores=scores)
+    per_gen = kept.reshape(10, 100)
+    assert per_gen.sum(axis=1).tolist() == [6] * 5 + [5] * 5
+    # the best scored of each generation
+    for gen in range(10):
+        gen_scores = scores[gen * 100:(gen + 1) * 100]
+        assert gen_scores[per_gen[gen]].min() >= gen_scores[~per_gen[gen]].max()
+
+def climb(parent, chain, graph):
+    """The first patent at or above parent that is not in a chain"""
+    while chain[parent]:
+        parent = int(graph[parent][0])
+    return parent
+
+def test_collapse_chains_links_around_every_chain():
+    # a long tail of patents citing only the one before
+    graph = random_graph(200)
+    children, parents = [ends.tolist() for ends in graph.edges()]
+    num_records = 260
+    children += list(range(200, 260))
+    parents += list(range(199, 259))
+    keys = numpy.unique(numpy.array(children) * num_records + parents)
+    graph = type(graph).from_rows(keys // num_records, keys % num_records, num_records)
+    # some citations among the first patents share keywords
+    inheriting = (keys // num_records < 200) & (numpy.arange(len(keys)) % 5 == 0)
+
+    kept, collapsed = detail.collapse_chains(graph, inheriting)
+    chain = ~kept
+    assert chain[200:259].all()
+    for child in numpy.flatnonzero(kept).tolist():
+        expected = sorted(set(climb(int(p), chain, graph) for p in graph[child]))
+        assert collapsed[child].tolist() == expected
+    assert not len(collapsed.take(numpy.flatnonzero(chain)).indices)
@@ -0,0 +1,44 @@
+import numpy
+import keywords
+
+
+
+def assigned(num_records=2000, num_traits=3, avg=True, num_keywords=50):
+    numpy.random.seed(5)
+    key_up = keywords.Keywords(num_records=num_records, num_traits=num_traits, avg=avg,
+                               num_keywords=num_keywords, gen_len=num_traits)
+    key_up.assign_keywords()
+    return key_up
+
+def test_assigned_phenomes_are_distinct_sorted_and_in_range():
+    # many keywords are redrawn on duplicates, few are ranked
+    for num_keywords in (50, 4):
+        key_up = assigned(num_keywords=num_keywords)
+        phenomes = key_up.phenomes
+        lengths = numpy.diff(phenomes.indptr)
+        assert len(lengths) == 2000
+        assert lengths.min() >= key_up.min_traits
+        assert lengths.max() <= min(key_up.max_traits, num_keywords)
+        for row in phenomes.tolists():
+            assert row == sorted(set(row))
+            assert all(0 <= keyword < num_keywords for keyword in row)
+        assert phenomes.frozensets() == [frozenset(row) for row in phenomes.tolists()]
+
+def test_keywords_are_drawn_uniformly_without_weights():
+    key_up = assigned(num_records=20000, num_traits=2, avg=False, num_keywords=10)
+    assert (numpy.diff(key_up.phenomes.indptr) == 2).all()
+    frequencies = numpy.bincount(key_up.phenomes.keywords, minlength=10) / 40000.
+    assert numpy.allclose(frequencies, 0.1, atol=0.01)
+
+def test_inverted_index_matches_a_phenome_scan():
+    phenomes = assigned(num_keywords=20).phenomes
+    sets = phenomes.frozensets()
+    for keywords in ([3], [0, 7, 19], [25, 'top'], []):
+        expected = [i for i, phenome in enumerate(sets) if phenome & set(keywords)]
+        assert phenomes.carrying(keywords).tolist() == expected
+
+    counts = [sum(1 for phenome in sets if k in phenome) for k in range(20)]
+    expected = sorted(((k, c) for k, c in enumerate(counts)), key=lambda pair: (-pair[1], pair[0]))
+    assert phenomes.top(5) == expected[:5]
+    assert phenomes.top(50) == expected
+    assert phenomes.top(0) == []
@@ -0,0 +1,33 @@
+import numpy
+import closure
+import lineage
+from test_closure import random_graph, bfs
+
+
+
+def test_reachable_matches_bfs_and_the_closure():
+    graph = random_graph()
+    children = graph.children()
+    descendants = closure.Closure(children, graph)
+    for i in range(len(graph)):
+        assert lineage.reachable(graph, i).tolist() == bfs(graph, i)
+        assert numpy.array_equal(lineage.reachable(children, i), descendants[i])
+
+def test_relatives_answer_from_a_bounded_cache():
+    graph = random_graph()
+    relatives = lineage.Relatives(graph.children(), cache_size=3)
+    assert relatives[5].tolist() == bfs(graph.children(), 5)
+    assert [r.tolist() for r in relatives.of([1, 2])] == [bfs(graph.children(), 1),
+                                                          bfs(graph.children(), 2)]
+    assert len(relatives.cache) == 3
+    relatives[7]
+    assert 5 not in relatives.cache and 7 in relatives.cache
+    assert relatives.counts([0, 7]).tolist() == [len(bfs(graph.children(), 0)),
+                                                len(bfs(graph.children(), 7))]
+
+def test_lru_cache_evicts_the_least_recently_used():
+    cache = lineage.LRUCache(2)
+    cache['a'], cache['b'] = 1, 2
+    cache['a']
+    cache['c'] = 3
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
@@ -0,0 +1,27 @@
+import numpy
+import pipeline
+
+
+
+def analyzed():
+    numpy.random.seed(11)
+    return pipeline.run(1500, 3, 'poisson', 50, 3, 12)
+
+def test_carriers_and_their_citations_match_a_phenome_scan():
+    na = analyzed()
+    children, parents = na.parentage.edges()
+    for keywords in ([4], [0, 11], ['top']):
+        scanned = numpy.array([bool(phenome & set(keywords)) for phenome in na.phenomes])
+        assert numpy.array_equal(na.carriers(keywords), scanned)
+
+        both = scanned[children] & scanned[parents]
+        carried_children, carried_parents = na.carrier_citations(keywords)
+        assert sorted(zip(carried_children.tolist(), carried_parents.tolist())) == sorted(
+            zip(children[both].tolist(), parents[both].tolist()))
+        assert numpy.array_equal(na.carried(children, parents, keywords), both)
+
+def test_top_keywords_match_a_phenome_scan():
+    na = analyzed()
+    counts = [sum(1 for phenome in na.phenomes if k in phenome) for k in range(12)]
+    expected = sorted(enumerate(counts), key=lambda pair: (-pair[1], pair[0]))
+    assert na.get_top_keywords(4) == expected[:4]
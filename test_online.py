@@ -0,0 +1,46 @@
+import numpy
+import keywords
+import lineage
+import online
+import patents
+
+
+
+def followed(num_records=600, gen_len=30, stop=None):
+    numpy.random.seed(9)
+    key_up = keywords.Keywords(num_records=num_records, num_traits=2, avg=False,
+                               num_keywords=10, gen_len=2)
+    key_up.assign_keywords()
+    some_patents = patents.PrefAging(num_records=num_records, num_parents=2, dist='poisson',
+                                     gen_len=gen_len, age_exp=1, cites_exp=1, output=False)
+    analysis = online.OnlineAnalysis(num_records, gen_len, key_up.phenomes)
+    analysis.follow(some_patents.stream(), stop)
+    return some_patents, key_up, analysis
+
+def test_online_statistics_match_the_finished_graph():
+    some_patents, key_up, analysis = followed()
+    graph = some_patents.citation_graph()
+    children, parents = graph.edges()
+    counts = numpy.bincount(parents, minlength=len(graph))
+
+    assert numpy.array_equal(analysis.citation_count, counts)
+    assert numpy.array_equal(analysis.histogram, numpy.bincount(counts))
+    assert analysis.descendant_counts().tolist() == [
+        len(lineage.reachable(graph.children(), i)) for i in range(30)]
+
+    # Gini from the sorted counts
+    ordered = numpy.sort(counts).astype(float)
+    ranks = numpy.arange(1, len(ordered) + 1)
+    expected = 2 * (ranks * ordered).sum() / (len(ordered) * ordered.sum()) - (len(ordered) + 1.) / len(ordered)
+    assert numpy.isclose(analysis.history[-1]['gini'], expected)
+
+    phenomes = key_up.phenomes.frozensets()
+    shared = [len(phenomes[c] & phenomes[p]) for c, p in zip(children.tolist(), parents.tolist())]
+    assert analysis.inherited == sum(shared)
+    assert analysis.inheriting == sum(1 for s in shared if s)
+    assert analysis.history[-1]['formed'] == 600
+
+def test_online_analysis_stops_once_stable():
+    some_patents, key_up, analysis = followed(stop=online.stable('gini', 0.05, 3))
+    assert analysis.formed < 600
+    assert analysis.history[-1]['formed'] == analysis.formed
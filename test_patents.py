@@ -0,0 +1,27 @@
+import random
+import numpy
+import patents
+
+
+
+def formed(**options):
+    random.seed(7)
+    numpy.random.seed(7)
+    some_patents = patents.PrefAging(num_records=500, num_parents=3, dist='poisson',
+                                     gen_len=50, age_exp=1, cites_exp=1, output=False,
+                                     **options)
+    some_patents.form_patents()
+    return some_patents
+
+def test_in_memory_log_rebuilds_graph_and_history():
+    # without output or history the graph comes back from the in-memory log
+    streamed = formed(history=False)
+    kept = formed(history=True)
+
+    graph, expected = streamed.citation_graph(), kept.citation_graph()
+    assert numpy.array_equal(graph.indptr, expected.indptr)
+    assert numpy.array_equal(graph.indices, expected.indices)
+
+    history = streamed.citation_history()
+    assert numpy.array_equal(history.final_counts(), streamed.citation_count)
+    assert numpy.array_equal(history.counts(streamed.gen_num), streamed.citation_count)
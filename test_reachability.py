@@ -0,0 +1,28 @@
+import numpy
+import reachability
+from test_closure import random_graph, bfs
+
+
+
+def test_reaches_matches_bfs_by_labels_searches_and_walks():
+    graph = random_graph()
+    children = graph.children()
+    targets = numpy.arange(len(graph))
+    # settle the undecided pairs by walks only, and by searches only
+    for max_searches in (0, len(graph)):
+        index = reachability.ReachabilityIndex(children, graph, max_searches)
+        for u in range(len(graph)):
+            expected = numpy.zeros(len(graph), dtype=bool)
+            expected[bfs(children, u)] = True
+            assert numpy.array_equal(index.reaches_all(u, targets), expected)
+        assert index.reaches(0, 299) == (299 in bfs(children, 0))
+
+def test_reached_from_any_source():
+    graph = random_graph()
+    children = graph.children()
+    index = reachability.ReachabilityIndex(children, graph)
+    sources = [3, 40, 41]
+    expected = numpy.zeros(len(graph), dtype=bool)
+    for u in sources:
+        expected[bfs(children, u)] = True
+    assert numpy.array_equal(index.reached_from(sources, numpy.arange(len(graph))), expected)
@@ -0,0 +1,53 @@
+import numpy
+import rwg
+
+
+
+def draw_frequencies(draws, n):
+    return numpy.bincount(draws, minlength=n) / float(len(draws))
+
+def test_sum_tree_prefix_and_find_match_cumulative_sums():
+    weights = numpy.array([3., 0., 1., 5., 0., 2., 4.])
+    tree = rwg.SumTree(len(weights))
+    tree.update(numpy.arange(len(weights)), weights)
+    tree.update([1, 3], [2., 1.])
+    weights[[1, 3]] = [2., 1.]
+
+    cumulative = numpy.concatenate(([0.], numpy.cumsum(weights)))
+    assert numpy.allclose(tree.weights(), weights)
+    assert numpy.isclose(tree.total(), weights.sum())
+    assert numpy.allclose(tree.prefix(numpy.arange(len(weights) + 1)), cumulative)
+
+    targets = numpy.linspace(0, weights.sum(), 50, endpoint=False)
+    expected = numpy.searchsorted(cumulative, targets, side='right') - 1
+    assert numpy.array_equal(tree.find(targets), expected)
+
+def test_sum_tree_draws_in_proportion_to_the_weights():
+    numpy.random.seed(2)
+    weights = numpy.array([1., 0., 3., 6., 0., 10.])
+    tree = rwg.SumTree(len(weights))
+    tree.update(numpy.arange(len(weights)), weights)
+
+    frequencies = draw_frequencies(tree.sample(200000), len(weights))
+    assert numpy.allclose(frequencies, weights / weights.sum(), atol=0.005)
+    assert frequencies[weights == 0].sum() == 0
+
+def test_alias_table_implies_exactly_the_probabilities():
+    numpy.random.seed(3)
+    probs = numpy.random.random(1000) ** 4
+    probs[::7] = 0
+    table = rwg.AliasTable(probs)
+
+    implied = table.prob + numpy.bincount(table.alias, weights=1 - table.prob,
+                                          minlength=len(probs))
+    assert numpy.allclose(implied / len(probs), probs / probs.sum())
+
+def test_alias_table_and_pool_draw_in_proportion_to_the_probabilities():
+    numpy.random.seed(4)
+    probs = numpy.array([0.1, 0.0, 0.25, 0.05, 0.6])
+    frequencies = draw_frequencies(rwg.AliasTable(probs).sample(200000), len(probs))
+    assert numpy.allclose(frequencies, probs, atol=0.005)
+
+    pool = rwg.generate_pool(200000, probs)
+    assert len(pool) == 200000
+    assert numpy.allclose(draw_frequencies(pool, len(probs)), probs, atol=0.005)
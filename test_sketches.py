@@ -0,0 +1,27 @@
+import numpy
+import pytest
+import sketches
+from test_closure import random_graph, bfs
+
+
+
+def test_sketches_merge_to_those_of_the_reachable_sets():
+    graph = random_graph()
+    children = graph.children()
+    sketched = sketches.ReachSketches(children, graph, precision=6)
+    for u in range(len(graph)):
+        # the sketch of exactly the rows u reaches
+        reached = numpy.array(bfs(children, u), dtype=numpy.int64)
+        registers = numpy.zeros((1, sketched.num_registers), dtype=numpy.uint8)
+        numpy.maximum.at(registers[0], sketched.register[reached], sketched.rank[reached])
+        assert sketched.counts()[u] == sketches.estimate(registers)[0]
+
+def test_sketch_errors_are_near_the_standard_error():
+    graph = random_graph(2000)
+    sketched = sketches.ReachSketches(graph.children(), graph, precision=10)
+    assert sketched.errors().mean() < 1.04 / 2 ** 5
+
+def test_sketch_precision_is_bounded():
+    graph = random_graph()
+    with pytest.raises(ValueError):
+        sketches.ReachSketches(graph.children(), graph, precision=3)
@@ -1,6 +1,4 @@
-import patents
-import keywords
-import networkanalysis
+import pipeline
 import time
 import csv
 import numpy
@@ -26,41 +24,20 @@ class Testing(object):
     self.cites_exp = cites_exp
   
   def lets_cite(self):
-    self.some_patents = patents.PrefAging(num_records=self.num_records, 
-                                          num_parents=self.num_parents,
-                                          dist = self.dist,
-                                          min_parents = 0, 
-                                          gen_len=self.gen_len,
-                                          age_exp = self.age_exp,
-                                          cites_exp = self.cites_exp
-                                          )
-                                     
-    self.some_patents.form_patents()
-
-    self.some_patents.write_count()
-    self.some_patents.cleanup()
+    self.some_patents = pipeline.cite(self.num_records, self.num_parents,
+                                      self.dist, self.gen_len,
+                                      self.age_exp, self.cites_exp)
     return self.some_patents
 
   def lets_keyword(self):
-    self.key_up = keywords.Keywords(num_records = self.num_records,
-                           num_traits=self.num_traits,
-                           avg=False,
-                           min_traits=0,
-                           num_keywords=self.num_keywords,
-                           gen_len=self.num_traits)
-                           
-    self.key_up.assign_keywords()
-    #print('Finished assigning keywords')
-    self.key_up.write_phenomes()
+    self.key_up = pipeline.keyword(self.num_records, self.num_traits,
+                                   self.num_keywords)
     return self.key_up
 
   def lets_network_and_analyze(self):
-    self.na = networkanalysis.NetworkAnalysis('parentage.csv',
-                              'phenomes.csv',
-                              'final_count.csv',
-                              num_traits=self.num_traits, 
-                              num_keywords=self.num_keywords,
-                              gen_len=self.gen_len)
+    self.na = pipeline.analyze(self.some_patents, self.key_up,
+                               self.num_traits, self.num_keywords,
+                               self.gen_len)
                               
     self.na.first_degree_chains()
    # self.na.write_inheritance_count()
@@ -99,7 +76,7 @@ test.lets_cite()
 test.lets_keyword()
 na = test.lets_network_and_analyze()
 
-xs = [(len(descendents), i) for i, descendents in enumerate(na.descendents[0:20])]
+xs = list(zip(na.descendant_counts(range(20)).tolist(), range(20)))
 xs.sort()
 # just the patent ids
 xs = [x[1] for x in xs]